@@ -18,7 +18,7 @@ from typing import Dict, List, Optional
 
 from dotenv import load_dotenv
 
-from browser_use.native_automation import NativeBrowserAutomation
+from browser_use import pool
 from browser_use.native_browser import BrowserType
 from browser_use.ai_controller import AIController
 
@@ -72,77 +72,106 @@ async def run_ai_driven_automation(
     if browser_type.lower() == "firefox":
         browser_enum = BrowserType.FIREFOX
     
-    # Create the browser automation instance
-    automation = NativeBrowserAutomation(
-        browser_type=browser_enum,
-        headless=headless,
-        output_dir=output_dir,
-        proxy_config=proxy_config,
-        extensions=extension_paths
-    )
-    
     try:
-        # Start the browser
-        logger.info(f"Starting {browser_type} browser")
-        await automation.start()
-        
-        # Navigate to the start URL
-        logger.info(f"Navigating to start URL: {start_url}")
-        await automation.navigate_to(start_url)
-        
-        # Get API key from environment if not provided
-        if not api_key:
-            # Check for provider-specific keys based on model
-            if "gpt" in model_name.lower() or "openai" in model_name.lower():
-                api_key = os.environ.get("OPENAI_API_KEY")
-            elif "claude" in model_name.lower():
-                api_key = os.environ.get("ANTHROPIC_API_KEY")
-            elif "gemini" in model_name.lower():
-                api_key = os.environ.get("GOOGLE_API_KEY")
-            else:
-                api_key = os.environ.get("LITELLM_API_KEY")
-                
-            if not api_key:
-                raise ValueError("No API key provided and none found in environment variables")
-        
-        # Create the AI controller
-        ai_controller = AIController(
-            automation=automation,
-            api_key=api_key,
-            model_name=model_name,
+        # Lease a warm browser from the pool instead of launching one per run
+        logger.info(f"Acquiring {browser_type} browser")
+        async with pool.lease(
+            browser_type=browser_enum,
+            headless=headless,
             output_dir=output_dir,
-            verbose=False
-        )
-        
-        # Run the task
-        logger.info(f"Running task: {task_description}")
-        result = await ai_controller.run_task(
-            task_description=task_description,
-            max_actions=max_actions
-        )
-        
-        # Log the result
-        logger.info(f"Task result: {json.dumps(result)}")
-        
-        # Save the result to a file
-        with open(output_path / "task_result.json", "w") as f:
-            json.dump(result, f, indent=2)
+            proxy_config=proxy_config,
+            extensions=extension_paths
+        ) as automation:
+            # Navigate to the start URL
+            logger.info(f"Navigating to start URL: {start_url}")
+            await automation.navigate_to(start_url)
+            
+            # Get API key from environment if not provided
+            if not api_key:
+                # Check for provider-specific keys based on model
+                if "gpt" in model_name.lower() or "openai" in model_name.lower():
+                    api_key = os.environ.get("OPENAI_API_KEY")
+                elif "claude" in model_name.lower():
+                    api_key = os.environ.get("ANTHROPIC_API_KEY")
+                elif "gemini" in model_name.lower():
+                    api_key = os.environ.get("GOOGLE_API_KEY")
+                else:
+                    api_key = os.environ.get("LITELLM_API_KEY")
+                    
+                if not api_key:
+                    raise ValueError("No API key provided and none found in environment variables")
+            
+            # Create the AI controller
+            ai_controller = AIController(
+                automation=automation,
+                api_key=api_key,
+                model_name=model_name,
+                output_dir=output_dir,
+                verbose=False
+            )
+            
+            # Run the task
+            logger.info(f"Running task: {task_description}")
+            result = await ai_controller.run_task(
+                task_description=task_description,
+                max_actions=max_actions
+            )
+            
+            # Log the result
+            logger.info(f"Task result: {json.dumps(result)}")
             
-        return result
+            # Save the result to a file
+            with open(output_path / "task_result.json", "w") as f:
+                json.dump(result, f, indent=2)
+                
+            return result
     
     except Exception as e:
         logger.error(f"Error in AI-driven automation: {e}")
         return {"success": False, "message": f"Error: {str(e)}"}
+
+async def run_ai_driven_automations(
+    task_descriptions: List[str],
+    concurrency: int = 4,
+    output_dir: str = "output/ai_driven",
+    **kwargs
+) -> List[Dict]:
+    """
+    Run several independent AI-driven automations concurrently.
+    
+    Each task gets its own browser from the pool and its own output subdirectory,
+    so tasks must not depend on each other's browser state.
+    
+    Args:
+        task_descriptions: Natural language descriptions of the tasks to perform
+        concurrency: Maximum number of tasks running at the same time
+        output_dir: Base directory to save outputs
+        **kwargs: Extra arguments for run_ai_driven_automation
+        
+    Returns:
+        List with the result of each automation, in task order
+    """
+    semaphore = asyncio.Semaphore(concurrency)
     
-    finally:
-        # Stop the browser
-        await automation.stop()
+    async def run_one(index: int, task_description: str) -> Dict:
+        async with semaphore:
+            return await run_ai_driven_automation(
+                task_description=task_description,
+                output_dir=str(Path(output_dir) / f"task_{index}"),
+                **kwargs
+            )
+    
+    return await asyncio.gather(
+        *[run_one(i, task) for i, task in enumerate(task_descriptions)]
+    )
 
 async def main():
     """Parse command-line arguments and run the AI-driven browser automation."""
     parser = argparse.ArgumentParser(description="AI-Driven Browser Automation Demo")
-    parser.add_argument("--task", type=str, required=True,
-                        help="Natural language description of the task to perform")
+    parser.add_argument("--task", type=str, action="append", required=True,
+                        help="Natural language description of the task to perform (repeat for several independent tasks)")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="Maximum number of tasks run at the same time")
     parser.add_argument("--browser", choices=["chrome", "firefox"], default="chrome",
                         help="Browser to use")
     parser.add_argument("--headless", action="store_true",
@@ -174,19 +203,30 @@ async def main():
             "port": args.proxy_port
         }
     
-    # Run the AI-driven automation
-    await run_ai_driven_automation(
-        task_description=args.task,
-        browser_type=args.browser,
-        headless=args.headless,
-        start_url=args.start_url,
-        output_dir=args.output_dir,
-        proxy_config=proxy_config,
-        extension_paths=args.extension,
-        model_name=args.model,
-        max_actions=args.max_actions,
-        api_key=args.api_key
-    )
+    automation_kwargs = {
+        "browser_type": args.browser,
+        "headless": args.headless,
+        "start_url": args.start_url,
+        "output_dir": args.output_dir,
+        "proxy_config": proxy_config,
+        "extension_paths": args.extension,
+        "model_name": args.model,
+        "max_actions": args.max_actions,
+        "api_key": args.api_key
+    }
+    
+    # Run the AI-driven automation, in parallel when several tasks are given
+    if len(args.task) == 1:
+        await run_ai_driven_automation(task_description=args.task[0], **automation_kwargs)
+    else:
+        await run_ai_driven_automations(
+            task_descriptions=args.task,
+            concurrency=args.concurrency,
+            **automation_kwargs
+        )
+    
+    # Shut down the pooled browsers
+    await pool.close()
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
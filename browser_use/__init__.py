@@ -1,15 +1,22 @@
 # browser_use package
-from browser_use.automation import BrowserAutomation
-from browser_use.native_browser import NativeBrowser, BrowserType
-from browser_use.native_automation import NativeBrowserAutomation
-from browser_use.extract import (
-    DataExtractor, 
-    WebElementExtractor, 
-    extract_structured_data,
-    ExtractionStrategy,
-    ExtractorConfig
-)
-from browser_use.ai_controller import AIController
+import importlib
+from typing import Any
+
+# Public names are imported lazily on first access (PEP 562), so importing the
+# package does not pull in Playwright, Selenium, LiteLLM, etc. up front
+_LAZY_IMPORTS = {
+    'BrowserAutomation': 'browser_use.automation',
+    'NativeBrowser': 'browser_use.native_browser',
+    'BrowserType': 'browser_use.native_browser',
+    'NativeBrowserAutomation': 'browser_use.native_automation',
+    'DataExtractor': 'browser_use.extract',
+    'WebElementExtractor': 'browser_use.extract',
+    'extract_structured_data': 'browser_use.extract',
+    'ExtractionStrategy': 'browser_use.extract',
+    'ExtractorConfig': 'browser_use.extract',
+    'AIController': 'browser_use.ai_controller',
+    'AIControllerPool': 'browser_use.ai_controller',
+}
 
 __all__ = [
     'BrowserAutomation',
@@ -21,5 +28,21 @@ __all__ = [
     'extract_structured_data',
     'ExtractionStrategy',
     'ExtractorConfig',
-    'AIController'
-] 
\ No newline at end of file
+    'AIController',
+    'AIControllerPool'
+]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name), name)
+    # Cache on the package so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
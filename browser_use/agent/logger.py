@@ -1,4 +1,7 @@
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 from typing import Optional
 
@@ -8,11 +11,32 @@ LOGGER_FORMAT = "%(levelname)-8s [%(name)s] %(message)s"
 # Create a logger for the agent
 agent_logger = logging.getLogger("agent")
 
+# Writes queued log records to the console from a background thread
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
+# Icons used when logging step evaluations
+_EVAL_ICONS = {
+    "success": "👍",
+    "failure": "❌",
+    "unknown": "🤷"
+}
+
+
+def _stop_queue_listener() -> None:
+    """Flush queued records and stop the background listener, if one is running."""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
 
 def setup_logging(level: str = "INFO") -> None:
     """
     Set up logging for the browser-use agent.
     
+    Records are put on a queue and written to the console by a background
+    thread, so logging calls don't block the event loop on console writes.
+    
     Args:
         level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
     """
@@ -26,9 +50,9 @@ def setup_logging(level: str = "INFO") -> None:
     root_logger.setLevel(numeric_level)
     
     # Clear any existing handlers to avoid duplicate logs
-    if root_logger.handlers:
-        for handler in root_logger.handlers:
-            root_logger.removeHandler(handler)
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+    _stop_queue_listener()
     
     # Create console handler
     console_handler = logging.StreamHandler(sys.stdout)
@@ -38,8 +62,14 @@ def setup_logging(level: str = "INFO") -> None:
     formatter = logging.Formatter(LOGGER_FORMAT)
     console_handler.setFormatter(formatter)
     
-    # Add handler to logger
-    root_logger.addHandler(console_handler)
+    # Route records through a queue; the listener thread does the actual writes
+    global _queue_listener
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _queue_listener = logging.handlers.QueueListener(
+        log_queue, console_handler, respect_handler_level=True
+    )
+    _queue_listener.start()
     
     # Configure browser_use logger
     browser_use_logger = logging.getLogger("browser_use")
@@ -50,6 +80,9 @@ def setup_logging(level: str = "INFO") -> None:
     agent_logger.setLevel(numeric_level)
 
 
+atexit.register(_stop_queue_listener)
+
+
 def log_task_start(task: str) -> None:
     """Log the start of a task."""
     agent_logger.info("🚀 Starting task: %s", task)
@@ -62,11 +95,9 @@ def log_step(step_number: int) -> None:
 
 def log_eval(status: str, message: str) -> None:
     """Log the evaluation of a step."""
-    icon = {
-        "success": "👍",
-        "failure": "❌",
-        "unknown": "🤷"
-    }.get(status.lower(), "🔄")
+    if not agent_logger.isEnabledFor(logging.INFO):
+        return
+    icon = _EVAL_ICONS.get(status.lower(), "🔄")
     agent_logger.info("%s Eval: %s - %s", icon, status.capitalize(), message)
 
 
@@ -97,8 +128,4 @@ def log_action_success(message: str) -> None:
 
 def log_task_completed(success: bool) -> None:
     """Log task completion."""
-    agent_logger.info("✅ Task completed")
-    if success:
-        agent_logger.info("✅ Successfully")
-    else:
-        agent_logger.info("❌ With failures") 
\ No newline at end of file
+    agent_logger.info("✅ Task completed %s", "✅ Successfully" if success else "❌ With failures") 
\ No newline at end of file
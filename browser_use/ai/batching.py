@@ -0,0 +1,106 @@
+"""
+Micro-batching for concurrent LLM requests.
+
+Requests submitted within a short window are coalesced into a single batch and
+dispatched together, so concurrent callers share one scheduling pass instead of
+each paying for its own round trip setup.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBatcher:
+    """
+    Collects submitted items and hands them to `process_batch` in groups.
+
+    A batch is flushed as soon as it reaches `max_batch_size` items, or after
+    `max_wait_ms` milliseconds have passed since its first item was submitted.
+    `process_batch` must return one result (or exception instance) per item,
+    in submission order.
+    """
+
+    def __init__(self,
+                 process_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+                 max_batch_size: int = 16,
+                 max_wait_ms: float = 15):
+        """
+        Initialize the batcher.
+
+        Args:
+            process_batch: Coroutine function that processes a list of items
+            max_batch_size: Maximum number of items dispatched in one batch
+            max_wait_ms: Maximum time to wait for a batch to fill up
+        """
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Submit an item and wait for its result.
+
+        Args:
+            item: The item to process
+
+        Returns:
+            The result produced for this item by `process_batch`
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait_ms / 1000, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """Dispatch all pending items as one batch."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._run(batch))
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        """Process a batch and resolve the futures of its items."""
+        logger.debug(f"Dispatching batch of {len(batch)} request(s)")
+        try:
+            results = await self.process_batch([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        except BaseException:
+            # Cancelled mid-batch: cancel the submitters' futures too, so their
+            # callers don't wait forever
+            for _, future in batch:
+                if not future.done():
+                    future.cancel()
+            raise
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,234 @@
+"""
+Response caching for LLM calls.
+
+Parsed LLM responses are cached by a hash of the request inputs (screenshot bytes
+and task description), so a repeated query against an unchanged page is answered
+from memory instead of paying a full model round trip.
+"""
+
+import hashlib
+import logging
+import math
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+try:
+    import diskcache
+except ImportError:  # Optional dependency, only needed for persistent caches
+    diskcache = None
+
+try:
+    import xxhash
+except ImportError:  # Optional dependency, blake2b is used instead
+    xxhash = None
+
+logger = logging.getLogger(__name__)
+
+
+def fast_digest(data: bytes) -> bytes:
+    """
+    Hash data for local equality checks, using xxh3 when xxhash is installed.
+
+    Args:
+        data: The bytes to hash (e.g. a screenshot or serialized DOM summary)
+
+    Returns:
+        A 16-byte digest
+    """
+    if xxhash is not None:
+        return xxhash.xxh3_128_digest(data)
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def make_cache_key(*parts: Union[bytes, str]) -> str:
+    """
+    Build a cache key from the given request inputs.
+
+    Args:
+        *parts: Raw bytes or strings identifying the request (e.g. screenshot bytes, query)
+
+    Returns:
+        Hex digest uniquely identifying the combination of parts
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        # Hash each part separately so that ("ab", "c") and ("a", "bc") differ
+        digest.update(fast_digest(part))
+    return digest.hexdigest()
+
+
+class LLMCache:
+    """
+    In-memory LRU cache with TTL expiry for parsed LLM responses.
+
+    Optionally backed by a `diskcache.Cache` directory so that entries survive
+    across runs.
+    """
+
+    def __init__(self,
+                 maxsize: int = 512,
+                 ttl: Optional[float] = 3600,
+                 persist_dir: Optional[Union[str, Path]] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries kept in memory
+            ttl: Time-to-live for entries in seconds (None for no expiry)
+            persist_dir: Optional directory for a persistent disk cache
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0}
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+        self._disk = None
+        if persist_dir:
+            if diskcache is None:
+                logger.warning("diskcache is not installed, LLM responses will only be cached in memory")
+            else:
+                self._disk = diskcache.Cache(str(persist_dir))
+
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a cached value.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            stored_at, value = entry
+            if self.ttl is None or time.monotonic() - stored_at < self.ttl:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return value
+            del self._entries[key]
+
+        if self._disk is not None:
+            value = self._disk.get(key)
+            if value is not None:
+                self._remember(key, value)
+                self.stats["hits"] += 1
+                return value
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: Any) -> None:
+        """
+        Store a value in the cache.
+
+        Args:
+            key: The cache key
+            value: The value to store
+        """
+        self._remember(key, value)
+        if self._disk is not None:
+            self._disk.set(key, value, expire=self.ttl)
+
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        self._entries.clear()
+        if self._disk is not None:
+            self._disk.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remember(self, key: str, value: Any) -> None:
+        """Insert an entry in memory, evicting the least recently used ones."""
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+class SemanticCache:
+    """
+    Similarity-based cache tier for near-duplicate queries.
+
+    Entries are grouped into buckets by a scope key (e.g. the screenshot hash), so a
+    query only matches earlier queries made against the same page. Within a bucket,
+    the stored query embedding with the highest cosine similarity above `threshold`
+    wins.
+    """
+
+    def __init__(self,
+                 threshold: float = 0.92,
+                 max_scopes: int = 128,
+                 max_entries_per_scope: int = 32):
+        """
+        Initialize the cache.
+
+        Args:
+            threshold: Minimum cosine similarity for a cached entry to be reused
+            max_scopes: Maximum number of scopes (pages) kept in memory
+            max_entries_per_scope: Maximum number of queries kept per scope
+        """
+        self.threshold = threshold
+        self.max_scopes = max_scopes
+        self.max_entries_per_scope = max_entries_per_scope
+        self._scopes: "OrderedDict[str, List[Tuple[List[float], Any]]]" = OrderedDict()
+
+    def get(self, scope: str, embedding: Sequence[float]) -> Optional[Any]:
+        """
+        Find the value stored for the most similar query in a scope.
+
+        Args:
+            scope: The scope key
+            embedding: Embedding of the query
+
+        Returns:
+            The cached value, or None if no entry is similar enough
+        """
+        entries = self._scopes.get(scope)
+        if not entries:
+            return None
+
+        query = _normalize(embedding)
+        best_score, best_value = self.threshold, None
+        for vector, value in entries:
+            score = sum(a * b for a, b in zip(vector, query))
+            if score >= best_score:
+                best_score, best_value = score, value
+
+        if best_value is not None:
+            self._scopes.move_to_end(scope)
+            logger.debug(f"Semantic cache hit with similarity {best_score:.3f}")
+        return best_value
+
+    def set(self, scope: str, embedding: Sequence[float], value: Any) -> None:
+        """
+        Store a value for a query in a scope.
+
+        Args:
+            scope: The scope key
+            embedding: Embedding of the query
+            value: The value to store
+        """
+        entries = self._scopes.setdefault(scope, [])
+        entries.append((_normalize(embedding), value))
+        if len(entries) > self.max_entries_per_scope:
+            del entries[0]
+
+        self._scopes.move_to_end(scope)
+        while len(self._scopes) > self.max_scopes:
+            self._scopes.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        self._scopes.clear()
+
+
+def _normalize(vector: Sequence[float]) -> List[float]:
+    """Scale a vector to unit length so cosine similarity becomes a dot product."""
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
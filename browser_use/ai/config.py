@@ -0,0 +1,78 @@
+"""
+Process-wide LiteLLM configuration shared by all LLM-backed controllers.
+"""
+
+import logging
+import os
+import threading
+from typing import Optional
+
+import litellm
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_configured = False
+
+
+def api_key_env_var(model_name: str, provider: Optional[str] = None) -> str:
+    """
+    Get the environment variable LiteLLM reads the API key for a model from.
+
+    Args:
+        model_name: The model to use
+        provider: Optional provider name (if using non-default mappings)
+
+    Returns:
+        Name of the environment variable
+    """
+    model = model_name.lower()
+    if "gemini" in model:
+        return "GOOGLE_API_KEY"
+    if "gpt" in model or "openai" in model:
+        return "OPENAI_API_KEY"
+    if "claude" in model:
+        return "ANTHROPIC_API_KEY"
+    if provider:
+        # For custom providers
+        return f"{provider.upper()}_API_KEY"
+    # Default fallback
+    return "LITELLM_API_KEY"
+
+
+def configure_litellm(api_key: str,
+                      model_name: str,
+                      provider: Optional[str] = None,
+                      verbose: bool = False) -> None:
+    """
+    Configure LiteLLM for a model.
+
+    LiteLLM is configured through module globals and environment variables, so the
+    shared defaults are applied only once and every controller reuses them. The API
+    key is only written when it changes.
+
+    Args:
+        api_key: API key for the LLM provider
+        model_name: The model to use
+        provider: Optional provider name (if using non-default mappings)
+        verbose: Whether to enable LiteLLM's verbose logging
+    """
+    global _configured
+
+    env_var = api_key_env_var(model_name, provider)
+    with _lock:
+        if os.environ.get(env_var) != api_key:
+            os.environ[env_var] = api_key
+
+        if verbose:
+            litellm.set_verbose = True
+
+        if _configured:
+            return
+
+        # Set safe defaults for LiteLLM to avoid timeouts
+        litellm.set_verbose = verbose
+        litellm.timeout = 60  # Longer timeout for processing images
+        litellm.drop_params = True  # Drop response_format for providers without JSON mode
+        _configured = True
+        logger.debug("LiteLLM configured")
@@ -1,18 +1,93 @@
 import asyncio
-import base64
-import json
 import logging
-import os
-from pathlib import Path
-from typing import Any, Dict, Optional, Tuple, Union
+import re
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import litellm
+import orjson
 from litellm.utils import get_secret
 
+from browser_use.ai.batching import AsyncBatcher
+from browser_use.ai.cache import LLMCache, SemanticCache, fast_digest, make_cache_key
+from browser_use.ai.config import configure_litellm
+from browser_use.ai.images import encode_screenshot
+from browser_use.ai.streaming import read_json_object
 from browser_use.dom.service import DomService
+from browser_use.dom.views import DOMState
 
 logger = logging.getLogger(__name__)
 
+# Static instructions for page analysis. Kept separate from the per-call prompt so
+# that providers with prompt/context caching can reuse the processed prefix.
+ACTION_SYSTEM_PROMPT = """
+# Browser Interaction Task
+
+You are an AI assistant that helps users interact with web browsers. You analyze screenshots of web pages
+that have interactive elements highlighted with colored boxes. Each element has an index number.
+
+## Instructions
+1. Analyze the screenshot and identify the interactive elements with colored highlight boxes
+2. Based on the task description, decide what action should be taken next
+3. Respond with ONLY a JSON object specifying the action in this format:
+   - For clicking an element: {"click_element": {"index": <element_index>}}
+   - For entering text: {"input_text": {"index": <element_index>, "text": "<text_to_enter>"}}
+   - For navigating to a URL: {"go_to_url": {"url": "<url_to_navigate>"}}
+   - For scrolling: {"scroll": {"direction": "<up|down|left|right>", "amount": <pixels>}}
+
+Return ONLY the JSON object and nothing else. Do not include explanations or additional text.
+"""
+
+# Per-call prompt; only the task and the element listing are substituted
+TASK_PROMPT_TEMPLATE = """
+## Your Task
+%s
+
+## Interactive Elements on the Page
+The following interactive elements are detected on the page with their index numbers:
+
+```
+%s
+```
+"""
+
+# Prefix of the task section when several tasks are answered in one request
+MULTI_TASK_INSTRUCTIONS = """Decide one action for EACH of the following independent tasks on this page.
+Respond with ONLY a JSON object of the form {"actions": [<action for task 1>, <action for task 2>, ...]},
+containing exactly one action object per task, in the same order as the tasks:"""
+
+# Ask providers that support it to enforce a JSON object response (JSON mode)
+JSON_RESPONSE_FORMAT = {"type": "json_object"}
+
+# Extracts the payload of a markdown code block (```json ... ``` or ``` ... ```)
+_FENCE_RE = re.compile(r"```(?:json)?\s*\n?(.*?)```", re.DOTALL)
+
+# Shared worker pool for CPU-bound screenshot compression and base64 encoding
+_image_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="llm-image")
+
+# Maximum number of elements described in a page analysis prompt
+MAX_PROMPT_ELEMENTS = 64
+
+# Element attributes worth describing to the LLM
+_KEEP_ATTRS = frozenset({"id", "class", "name", "type", "role", "href"})
+
+# Number of formatted element listings remembered per controller
+ELEMENTS_TEXT_CACHE_SIZE = 32
+
+def strip_code_fence(text: str) -> str:
+    """
+    Return the contents of the first markdown code block in a text.
+    
+    Args:
+        text: Raw LLM output, possibly wrapped in ``` or ```json fences
+        
+    Returns:
+        The fenced payload, or the stripped text if it contains no code block
+    """
+    match = _FENCE_RE.search(text)
+    return match.group(1).strip() if match else text.strip()
+
 class LLMController:
     """
     Controller that uses LiteLLM to analyze browser screenshots and DOM structure
@@ -22,7 +97,15 @@ class LLMController:
     def __init__(self, 
                  api_key: str, 
                  model_name: str = "gemini/gemini-2.5-pro-exp-03-25",
-                 provider: Optional[str] = None):
+                 provider: Optional[str] = None,
+                 cache_size: int = 512,
+                 cache_ttl: Optional[float] = 3600,
+                 cache_dir: Optional[str] = None,
+                 max_batch_size: int = 16,
+                 batch_wait_ms: float = 15,
+                 max_concurrency: int = 4,
+                 embedding_model: Optional[str] = None,
+                 similarity_threshold: float = 0.92):
         """
         Initialize the LLM controller.
         
@@ -30,32 +113,41 @@ class LLMController:
             api_key: API key for the LLM provider
             model_name: The model to use (default: gemini-pro-vision)
             provider: Optional provider name (if using non-default mappings)
+            cache_size: Maximum number of cached responses (0 disables caching)
+            cache_ttl: Time-to-live for cached responses in seconds
+            cache_dir: Optional directory to persist cached responses across runs
+            max_batch_size: Maximum number of concurrent LLM requests dispatched together
+            batch_wait_ms: How long to wait for concurrent requests to join a batch
+            max_concurrency: Maximum number of LLM requests in flight at once (provider QPS guard)
+            embedding_model: Optional embedding model enabling a semantic cache tier that
+                reuses actions for similarly worded tasks on an identical page
+            similarity_threshold: Minimum cosine similarity for a semantic cache hit
         """
         self.api_key = api_key
         self.model_name = model_name
         self.provider = provider
+        self.cache = LLMCache(maxsize=cache_size, ttl=cache_ttl, persist_dir=cache_dir) if cache_size > 0 else None
+        self.embedding_model = embedding_model
+        self.semantic_cache = SemanticCache(threshold=similarity_threshold) if embedding_model else None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._elements_text_cache: "OrderedDict[bytes, str]" = OrderedDict()
+        self._batcher = AsyncBatcher(self._complete_batch, max_batch_size=max_batch_size, max_wait_ms=batch_wait_ms)
+        # DOM state the last analysis was based on, so the chosen action can be
+        # executed without enumerating the page again
+        self.last_dom_state: Optional[DOMState] = None
         self._setup_litellm()
+    
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Cache hit/miss counters for analyzed pages."""
+        if self.cache is None:
+            return {"hits": 0, "misses": 0}
+        return self.cache.stats
         
     def _setup_litellm(self):
         """Configure LiteLLM with the provided API key."""
-        # Set default API keys based on model 
-        if "gemini" in self.model_name.lower():
-            os.environ["GOOGLE_API_KEY"] = self.api_key
-        elif "gpt" in self.model_name.lower() or "openai" in self.model_name.lower():
-            os.environ["OPENAI_API_KEY"] = self.api_key
-        elif "claude" in self.model_name.lower():
-            os.environ["ANTHROPIC_API_KEY"] = self.api_key
-        else:
-            # For custom providers
-            if self.provider:
-                os.environ[f"{self.provider.upper()}_API_KEY"] = self.api_key
-            else:
-                # Default fallback
-                os.environ["LITELLM_API_KEY"] = self.api_key
-        
-        # Set safe defaults for LiteLLM to avoid timeouts
-        litellm.set_verbose = False
-        litellm.timeout = 60  # Longer timeout for processing images
+        configure_litellm(self.api_key, self.model_name, self.provider)
         
     async def analyze_page(self, dom_service: DomService, screenshot_path: str, task_description: str) -> Dict[str, Any]:
         """
@@ -69,82 +161,275 @@ class LLMController:
         Returns:
             A dictionary with the action to take (click_element, input_text, go_to_url, etc.)
         """
-        # Get the DOM tree and interactive elements
-        dom_state = await dom_service.get_clickable_elements(highlight_elements=True)
-        
-        # Take a screenshot with highlighted elements
-        await dom_service.take_screenshot_with_highlights(screenshot_path)
+        # Get the interactive elements and a screenshot showing their highlights
+        dom_state, raw_image = await dom_service.capture_highlighted_state(screenshot_path)
+        self.last_dom_state = dom_state
         
         # Extract useful information about interactive elements
+        elements_info = self._summarize_elements(dom_state)
+        
+        # Identical requests already being analyzed share the same LLM call. The DOM
+        # fingerprint is part of the key so a page that looks the same but has
+        # different elements (and indices) doesn't reuse a stale action
+        request_key = make_cache_key(raw_image, self._dom_fingerprint(elements_info), task_description)
+        inflight = self._inflight.get(request_key)
+        if inflight is not None:
+            logger.debug(f"Joining in-flight analysis for task: {task_description}")
+            return dict(await asyncio.shield(inflight))
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[request_key] = future
+        try:
+            action = await self._decide_action(request_key, raw_image, elements_info, task_description)
+            future.set_result(action)
+            return action
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            del self._inflight[request_key]
+    
+    async def analyze_multi(self,
+                            dom_service: DomService,
+                            task_descriptions: List[str],
+                            screenshot_path: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Decide the next action for several independent tasks on the same page.
+        
+        The page is captured once and all tasks are answered by a single LLM request.
+        If the model does not return one valid action per task, the tasks are analyzed
+        individually (and concurrently) against the same captured state.
+        
+        Args:
+            dom_service: The DOM service instance with the current page
+            task_descriptions: Descriptions of the independent tasks
+            screenshot_path: Optional path to also save the screenshot to
+            
+        Returns:
+            One action dictionary per task, in order
+        """
+        dom_state, raw_image = await dom_service.capture_highlighted_state(screenshot_path)
+        self.last_dom_state = dom_state
+        elements_info = self._summarize_elements(dom_state)
+        
+        tasks = "\n".join(f"{i}. {task}" for i, task in enumerate(task_descriptions, 1))
+        prompt = self._create_prompt(
+            f"{MULTI_TASK_INSTRUCTIONS}\n{tasks}", elements_info
+        )
+        image_data = await self.encode_image(raw_image)
+        response = await self._query_llm(
+            prompt, image_data, json_mode=True, system_prompt=ACTION_SYSTEM_PROMPT
+        )
+        
+        try:
+            actions = self._load_json(response)["actions"]
+            if len(actions) != len(task_descriptions):
+                raise ValueError(f"Expected {len(task_descriptions)} actions, got {len(actions)}")
+            return [self._validate_action(action) for action in actions]
+        except Exception as e:
+            logger.warning(f"Batched analysis failed, analyzing tasks individually: {e}")
+        
+        fingerprint = self._dom_fingerprint(elements_info)
+        return await asyncio.gather(*[
+            self._decide_action(make_cache_key(raw_image, fingerprint, task), raw_image, elements_info, task)
+            for task in task_descriptions
+        ])
+    
+    @staticmethod
+    def _summarize_elements(dom_state: DOMState) -> List[Dict[str, Any]]:
+        """
+        Summarize the interactive elements of a DOM state for the prompt.
+        
+        Only interactive elements in the viewport are included, largest first, and at
+        most MAX_PROMPT_ELEMENTS of them, to keep the prompt small on busy pages.
+        
+        Args:
+            dom_state: The captured DOM state
+            
+        Returns:
+            One summary dictionary per included element
+        """
+        def area(item):
+            rect = item[1].viewport_coordinates
+            return rect.width * rect.height if rect is not None else 0
+        
+        candidates = [
+            item for item in dom_state.selector_map.items()
+            if item[1].is_in_viewport and item[1].is_interactive
+        ]
+        candidates.sort(key=area, reverse=True)
+        
         elements_info = []
-        for idx, element in dom_state.selector_map.items():
+        for idx, element in candidates[:MAX_PROMPT_ELEMENTS]:
             elements_info.append({
                 "index": idx,
                 "tag_name": element.tag_name,
                 "text": element.get_all_text_till_next_clickable_element()[:100],  # Limit text length
                 "is_interactive": element.is_interactive,
                 "is_in_viewport": element.is_in_viewport,
-                "attributes": {k: v for k, v in element.attributes.items() if k in ['id', 'class', 'name', 'type', 'role', 'href']}
+                "attributes": {k: element.attributes[k] for k in _KEEP_ATTRS & element.attributes.keys()}
             })
+        return elements_info
+    
+    async def _decide_action(self,
+                             request_key: str,
+                             raw_image: bytes,
+                             elements_info: List[Dict[str, Any]],
+                             task_description: str) -> Dict[str, Any]:
+        """
+        Determine the next action from the cache or by querying the LLM.
+        
+        Args:
+            request_key: Hash of the screenshot, DOM fingerprint and task description
+            raw_image: The highlighted screenshot bytes
+            elements_info: Summary of the interactive elements on the page
+            task_description: Description of what the user wants to accomplish
+            
+        Returns:
+            A dictionary with the action to take
+        """
+        # Short-circuit if the same task was already analyzed on an identical page
+        if self.cache is not None:
+            cached_action = await self.cache.get(request_key)
+            if cached_action is not None:
+                logger.debug(f"LLM cache hit for task: {task_description}")
+                return dict(cached_action)
+        
+        # Fall back to a similarly worded task on the same page
+        page_key = task_embedding = None
+        if self.semantic_cache is not None:
+            # The DOM fingerprint keeps pages that look alike but index their
+            # elements differently from sharing actions
+            page_key = make_cache_key(raw_image, self._dom_fingerprint(elements_info))
+            task_embedding = await self._embed(task_description)
+            if task_embedding is not None:
+                cached_action = self.semantic_cache.get(page_key, task_embedding)
+                if cached_action is not None:
+                    logger.debug(f"Semantic cache hit for task: {task_description}")
+                    return dict(cached_action)
         
         # Create the prompt for the LLM
         prompt = self._create_prompt(task_description, elements_info)
         
-        # Convert screenshot to base64 for the API
-        with open(screenshot_path, "rb") as img_file:
-            image_data = base64.b64encode(img_file.read()).decode("utf-8")
+        # Downscale, JPEG-encode and base64-encode the screenshot off the event loop
+        image_data = await self.encode_image(raw_image)
         
         # Send to LLM for analysis
-        response = await self._query_llm(prompt, image_data)
+        response = await self._query_llm(
+            prompt, image_data, json_mode=True, system_prompt=ACTION_SYSTEM_PROMPT
+        )
         
-        # Parse and return the action
-        return self._parse_llm_response(response)
-    
-    def _create_prompt(self, task_description: str, elements_info: list) -> str:
-        """Create a prompt for the LLM model."""
-        prompt = f"""
-        # Browser Interaction Task
+        # Parse the action and cache it if it is valid
+        action = self._parse_llm_response(response)
+        if "error" not in action:
+            if self.cache is not None:
+                await self.cache.set(request_key, action)
+            if task_embedding is not None:
+                self.semantic_cache.set(page_key, task_embedding, action)
         
-        You are an AI assistant that helps users interact with web browsers. You analyze screenshots of web pages 
-        that have interactive elements highlighted with colored boxes. Each element has an index number.
+        return action
+    
+    async def encode_image(self, raw_image: bytes) -> str:
+        """
+        Prepare a screenshot for the LLM in the shared image worker pool.
         
-        ## Your Task
-        {task_description}
+        Args:
+            raw_image: Encoded screenshot bytes
+            
+        Returns:
+            Base64-encoded JPEG data
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_image_executor, encode_screenshot, raw_image)
+    
+    async def _embed(self, text: str) -> Optional[List[float]]:
+        """
+        Embed a text with the configured embedding model.
         
-        ## Interactive Elements on the Page
-        The following interactive elements are detected on the page with their index numbers:
+        Args:
+            text: The text to embed
+            
+        Returns:
+            The embedding vector, or None if the request failed
+        """
+        try:
+            response = await litellm.aembedding(model=self.embedding_model, input=[text])
+            return response["data"][0]["embedding"]
+        except Exception as e:
+            logger.warning(f"Error embedding task description: {e}")
+            return None
+    
+    def _create_prompt(self, task_description: str, elements_info: list) -> str:
+        """
+        Create the dynamic part of the prompt for the LLM model.
         
-        ```
-        {json.dumps(elements_info, indent=2)}
-        ```
+        The static instructions live in ACTION_SYSTEM_PROMPT and are sent as a
+        system message ahead of this prompt, so providers can cache that prefix.
+        """
+        return TASK_PROMPT_TEMPLATE % (task_description, self._format_elements(elements_info))
+    
+    @staticmethod
+    def _dom_fingerprint(elements_info: list) -> bytes:
+        """
+        Hash the element summaries of a page.
         
-        ## Instructions
-        1. Analyze the screenshot and identify the interactive elements with colored highlight boxes
-        2. Based on the task description, decide what action should be taken next
-        3. Respond with ONLY a JSON object specifying the action in this format:
-           - For clicking an element: {{"click_element": {{"index": <element_index>}}}}
-           - For entering text: {{"input_text": {{"index": <element_index>, "text": "<text_to_enter>"}}}}
-           - For navigating to a URL: {{"go_to_url": {{"url": "<url_to_navigate>"}}}}
-           - For scrolling: {{"scroll": {{"direction": "<up|down|left|right>", "amount": <pixels>}}}}
+        Args:
+            elements_info: Summary of the interactive elements on the page
+            
+        Returns:
+            A 16-byte digest that changes whenever the summarized elements change
+        """
+        return fast_digest(orjson.dumps(elements_info, option=orjson.OPT_SORT_KEYS))
+    
+    def _format_elements(self, elements_info: list) -> str:
+        """
+        Format the element summaries for the prompt, reusing the result for unchanged pages.
         
-        Return ONLY the JSON object and nothing else. Do not include explanations or additional text.
+        Args:
+            elements_info: Summary of the interactive elements on the page
+            
+        Returns:
+            The indented JSON listing of the elements
         """
-        return prompt
+        key = self._dom_fingerprint(elements_info)
+        text = self._elements_text_cache.get(key)
+        if text is not None:
+            self._elements_text_cache.move_to_end(key)
+            return text
+        
+        text = orjson.dumps(elements_info, option=orjson.OPT_INDENT_2).decode()
+        self._elements_text_cache[key] = text
+        if len(self._elements_text_cache) > ELEMENTS_TEXT_CACHE_SIZE:
+            self._elements_text_cache.popitem(last=False)
+        return text
     
-    async def _query_llm(self, prompt: str, image_data: str) -> str:
+    async def _query_llm(self,
+                         prompt: str,
+                         image_data: str,
+                         json_mode: bool = False,
+                         system_prompt: Optional[str] = None) -> str:
         """
         Query the LLM with a prompt and image using LiteLLM.
         
         Args:
             prompt: The text prompt to send to the LLM
             image_data: Base64-encoded image data
+            json_mode: Whether to request a structured JSON object response
+            system_prompt: Optional static instructions sent as a system message
             
         Returns:
             The response from the LLM
         """
         try:
-            # Create a message list with text and image
-            messages = [
+            # Static instructions go first so the prefix is identical across calls
+            messages = []
+            if system_prompt:
+                messages.append({"role": "system", "content": system_prompt})
+            
+            # Add the dynamic text and image
+            messages.append(
                 {
                     "role": "user", 
                     "content": [
@@ -152,18 +437,15 @@ class LLMController:
                         {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{image_data}"}}
                     ]
                 }
-            ]
-            
-            # Generate response using asyncio and litellm
-            response = await asyncio.to_thread(
-                lambda: litellm.completion(
-                    model=self.model_name,
-                    messages=messages,
-                    temperature=0.1,
-                    max_tokens=1024
-                )
             )
             
+            # Generate response, sharing a batch with any concurrent requests
+            # JSON responses are streamed and returned as soon as the object is complete
+            completion_kwargs = {"response_format": JSON_RESPONSE_FORMAT, "stream_json": True} if json_mode else {}
+            response = await self._batcher.submit((messages, completion_kwargs))
+            if isinstance(response, str):
+                return response
+            
             # Extract the content from the response
             if hasattr(response, 'choices') and len(response.choices) > 0:
                 if hasattr(response.choices[0], 'message') and hasattr(response.choices[0].message, 'content'):
@@ -174,7 +456,69 @@ class LLMController:
             
         except Exception as e:
             logger.error(f"Error querying LLM: {e}")
-            return json.dumps({"error": str(e)})
+            return orjson.dumps({"error": str(e)}).decode()
+    
+    async def _complete_batch(self, batch: List[Tuple[List[Dict[str, Any]], Dict[str, Any]]]) -> List[Any]:
+        """
+        Run a batch of completion requests concurrently.
+        
+        Args:
+            batch: List of (messages, extra completion kwargs) tuples, one per request
+            
+        Returns:
+            One LiteLLM response (or exception) per request, in order
+        """
+        return await asyncio.gather(
+            *[self._complete(messages, **kwargs) for messages, kwargs in batch],
+            return_exceptions=True
+        )
+    
+    async def _complete(self, messages: List[Dict[str, Any]], stream_json: bool = False, **kwargs: Any) -> Any:
+        """
+        Run a single completion request on LiteLLM's native async client.
+        
+        Args:
+            messages: The messages to send to the LLM
+            stream_json: Stream the response and stop once a complete JSON object arrived
+            **kwargs: Extra arguments for the completion call (e.g. response_format)
+            
+        Returns:
+            The LiteLLM response, or the JSON object text when streaming
+        """
+        async with self._semaphore:
+            # Pass the key explicitly: the environment variable is shared by every
+            # controller in the process and may hold another controller's key
+            response = await litellm.acompletion(
+                model=self.model_name,
+                messages=messages,
+                api_key=self.api_key,
+                temperature=0.1,
+                max_tokens=1024,
+                stream=stream_json,
+                **kwargs
+            )
+            if stream_json:
+                return await read_json_object(response)
+            return response
+    
+    @staticmethod
+    def _load_json(response: str) -> Any:
+        """Load the JSON payload of an LLM response, unwrapping markdown code blocks."""
+        # With JSON mode the response is usually a bare JSON object, so skip the regex
+        payload = response.lstrip()
+        if not payload.startswith("{"):
+            # Providers without JSON mode may wrap the JSON in markdown code blocks
+            payload = strip_code_fence(response)
+        
+        return orjson.loads(payload)
+    
+    @staticmethod
+    def _validate_action(action: Any) -> Dict[str, Any]:
+        """Check that an action object names a supported action."""
+        valid_actions = ["click_element", "input_text", "go_to_url", "scroll"]
+        if not isinstance(action, dict) or not any(a in action for a in valid_actions):
+            raise ValueError(f"Invalid action format: {action}")
+        return action
     
     def _parse_llm_response(self, response: str) -> Dict[str, Any]:
         """
@@ -187,31 +531,7 @@ class LLMController:
             A dictionary with the action to take
         """
         try:
-            # Clean up response to extract just the JSON part
-            # Sometimes the model might include markdown code blocks or extra text
-            clean_response = response.strip()
-            
-            # If response is wrapped in markdown code blocks, extract the JSON
-            if clean_response.startswith("```json"):
-                clean_response = clean_response.replace("```json", "", 1)
-                if "```" in clean_response:
-                    clean_response = clean_response.split("```")[0]
-            elif clean_response.startswith("```"):
-                clean_response = clean_response.replace("```", "", 1)
-                if "```" in clean_response:
-                    clean_response = clean_response.split("```")[0]
-            
-            # Parse the JSON
-            action = json.loads(clean_response.strip())
-            
-            # Validate the action format
-            valid_actions = ["click_element", "input_text", "go_to_url", "scroll"]
-            action_type = next((a for a in valid_actions if a in action), None)
-            
-            if action_type is None:
-                raise ValueError(f"Invalid action format: {action}")
-                
-            return action
+            return self._validate_action(self._load_json(response))
         except Exception as e:
             logger.error(f"Error parsing LLM response: {e}")
             logger.error(f"Original response: {response}")
@@ -0,0 +1,103 @@
+"""
+Incremental parsing of streamed LLM responses.
+
+Action responses are a single JSON object. Scanning the stream as it arrives lets
+the caller use the object as soon as its closing brace is received, instead of
+waiting for the provider to finish the response.
+"""
+
+import logging
+from typing import Any, AsyncIterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class JsonObjectScanner:
+    """
+    Finds the first complete top-level JSON object in text fed in chunks.
+
+    Tracks brace depth while skipping over string contents (including escaped
+    quotes), so only structural braces are counted. Each character is examined once.
+    """
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._length = 0
+        self._start: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    @property
+    def text(self) -> str:
+        """All text fed so far."""
+        return "".join(self._parts)
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """
+        Add a chunk of text.
+
+        Args:
+            chunk: The next piece of the response
+
+        Returns:
+            The first complete JSON object once it has been closed, otherwise None
+        """
+        offset = self._length
+        self._parts.append(chunk)
+        self._length += len(chunk)
+
+        for i, char in enumerate(chunk):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                if self._start is not None:
+                    self._in_string = True
+            elif char == "{":
+                if self._start is None:
+                    self._start = offset + i
+                self._depth += 1
+            elif char == "}" and self._start is not None:
+                self._depth -= 1
+                if self._depth == 0:
+                    return self.text[self._start:offset + i + 1]
+
+        return None
+
+
+async def read_json_object(stream: AsyncIterator[Any]) -> str:
+    """
+    Read a streamed completion until its first top-level JSON object is complete.
+
+    The stream is closed as soon as the object is complete, so the rest of the
+    generation is not waited for.
+
+    Args:
+        stream: A LiteLLM streaming completion response
+
+    Returns:
+        The JSON object text, or the full response text if no complete object arrived
+    """
+    scanner = JsonObjectScanner()
+    try:
+        async for chunk in stream:
+            content = chunk.choices[0].delta.content
+            if not content:
+                continue
+            payload = scanner.feed(content)
+            if payload is not None:
+                return payload
+    finally:
+        close = getattr(stream, "aclose", None)
+        if close is not None:
+            try:
+                await close()
+            except Exception as e:
+                logger.debug(f"Error closing response stream: {e}")
+
+    return scanner.text
@@ -6,20 +6,143 @@ decisions about what actions to take based on the current state of the browser.
 """
 
 import asyncio
-import json
 import logging
 import os
+import re
+from collections import OrderedDict, deque
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Union
 
+import aiofiles
 import litellm
+import orjson
 from litellm.utils import get_secret
 
+from browser_use.ai.batching import AsyncBatcher
+from browser_use.ai.cache import LLMCache, make_cache_key
+from browser_use.ai.config import configure_litellm
+from browser_use.ai.images import JPEG_QUALITY, encode_screenshot, screenshot_to_jpeg
 from browser_use.extract import DataExtractor
 from browser_use.native_automation import NativeBrowserAutomation
 
 logger = logging.getLogger(__name__)
 
+
+IMAGE_CACHE_SIZE = 64
+
+# Maximum number of entries kept in the state and action histories
+MAX_HISTORY = 64
+
+# Transient LLM errors worth retrying, how many attempts to make, and the first backoff delay
+RETRYABLE_LLM_ERRORS = (litellm.RateLimitError, litellm.APIConnectionError, litellm.ServiceUnavailableError)
+LLM_MAX_ATTEMPTS = 3
+LLM_RETRY_BASE_DELAY = 0.5
+
+# Number of recent states whose full structured data is kept in memory
+RECENT_STRUCTURED_DATA = 4
+
+# Structured-data entries included in the prompt, and the length each is cut to
+MAX_PROMPT_DATA_ITEMS = 10
+MAX_DATA_ITEM_CHARS = 200
+
+_WORD_RE = re.compile(r"\w+")
+
+# Longest wait for the page to settle after an action, and how often readiness is polled
+SETTLE_TIMEOUT = 1.0
+SETTLE_POLL_INTERVAL = 0.1
+
+# How long an action gets to start a navigation before the page is taken as unchanged
+NAVIGATION_START_TIMEOUT = 0.3
+
+# Returns the current URL and document.readyState
+PAGE_STATE_SCRIPT = "return [window.location.href, document.readyState];"
+
+# Pause after a scroll so lazy-loaded content can render
+SCROLL_SETTLE_DELAY = 0.2
+
+# Scrolls the window by (arguments[0], arguments[1]) pixels
+SCROLL_BY_SCRIPT = "window.scrollBy(arguments[0], arguments[1]);"
+
+# Per-step prompt, filled with the task, URL, title, page data and recent actions
+ACTION_PROMPT_TEMPLATE = """# Current Task
+%s
+
+# Current Browser State
+URL: %s
+Title: %s
+
+# Page Data
+%s
+
+# Previous Actions
+%s
+
+The screenshot of the current page state is attached to this message.
+
+Analyze the current state and suggest the next action to take to accomplish the task.
+Respond with a JSON object as specified. Don't use markdown for the JSON."""
+
+# Body of the first ``` or ```json fenced block in an LLM response
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+
+
+def _dumps(obj: Any, indent: bool = False) -> str:
+    """
+    Serialize an object to a JSON string with orjson.
+
+    Values that aren't JSON-native are serialized with str(), so action results
+    holding arbitrary objects can still be logged and put in prompts.
+
+    Args:
+        obj: The object to serialize
+        indent: Whether to indent the output by two spaces
+
+    Returns:
+        The JSON string
+    """
+    return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+
+
+# Encoded data URLs keyed on (path, mtime, size), least recently used first
+_image_url_cache: "OrderedDict[Tuple[str, float, int], str]" = OrderedDict()
+
+
+async def _encode_image(path: str) -> Optional[str]:
+    """
+    Read an image, compress it and encode it as a JPEG data URL.
+
+    Results are cached on (path, mtime, size), so an image that is rewritten at the
+    same path is read and encoded again.
+
+    Args:
+        path: Path to the image file
+
+    Returns:
+        The base64 data URL for the image, or None if the file doesn't exist
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+
+    key = (path, st.st_mtime, st.st_size)
+    cached = _image_url_cache.get(key)
+    if cached is not None:
+        _image_url_cache.move_to_end(key)
+        return cached
+
+    async with aiofiles.open(path, "rb") as img_file:
+        raw = await img_file.read()
+
+    # Downscaling and JPEG re-encoding is CPU-bound, so keep it off the event loop
+    url = f"data:image/jpeg;base64,{await asyncio.to_thread(encode_screenshot, raw)}"
+
+    _image_url_cache[key] = url
+    if len(_image_url_cache) > IMAGE_CACHE_SIZE:
+        _image_url_cache.popitem(last=False)
+    return url
+
+
 class AIController:
     """
     AI Controller for browser automation.
@@ -28,6 +151,25 @@ class AIController:
     decisions about what actions to take based on the current state of the browser.
     """
     
+    SYSTEM_MESSAGE = """You are an AI assistant that helps with browser automation. Your task is to analyze the
+current state of a browser and suggest the next action to take to accomplish a given task.
+
+You should respond with a JSON object specifying the action to take. The actions you can suggest are:
+1. {"action": "navigate", "url": "<url>"}
+2. {"action": "click", "selector": "<css_selector>"}
+3. {"action": "input", "selector": "<css_selector>", "text": "<text>"}
+4. {"action": "extract", "extraction_config": {...}}
+5. {"action": "wait", "seconds": <seconds>}
+6. {"action": "scroll", "direction": "up|down|left|right", "amount": <pixels>}
+7. {"action": "think", "reasoning": "<thinking step>"}
+8. {"action": "complete", "result": "<task completion result>"}
+
+The "think" action is for when you need to reason through the next steps but aren't ready
+to suggest a concrete browser action yet. Multiple "think" steps can be used, but try to
+be efficient and don't exceed 3 thinking steps before taking action.
+
+The "complete" action is for when you believe the task is complete."""
+    
     def __init__(self, 
                 automation: NativeBrowserAutomation,
                 api_key: str, 
@@ -35,7 +177,9 @@ class AIController:
                 provider: Optional[str] = None,
                 max_thinking_steps: int = 5,
                 output_dir: str = "output",
-                verbose: bool = False):
+                verbose: bool = False,
+                pool: Optional["AIControllerPool"] = None,
+                response_cache_size: int = 256):
         """
         Initialize the AI controller.
         
@@ -47,6 +191,8 @@ class AIController:
             max_thinking_steps: Maximum number of thinking steps before taking action
             output_dir: Directory to save outputs
             verbose: Whether to print verbose logging
+            pool: Optional pool shared with other controllers to batch LLM requests
+            response_cache_size: Number of LLM responses to cache by page and task (0 to disable)
         """
         self.automation = automation
         self.api_key = api_key
@@ -55,6 +201,10 @@ class AIController:
         self.max_thinking_steps = max_thinking_steps
         self.output_dir = Path(output_dir)
         self.verbose = verbose
+        self.pool = pool
+        
+        # Requests about an unchanged page and task (e.g. re-thinking) reuse the previous response
+        self._response_cache = LLMCache(maxsize=response_cache_size, ttl=None) if response_cache_size > 0 else None
         
         # Create output directory if it doesn't exist
         self.output_dir.mkdir(exist_ok=True)
@@ -62,30 +212,21 @@ class AIController:
         # Set up LLM
         self._setup_llm()
         
-        # State tracking
-        self.state_history = []
-        self.action_history = []
+        # State tracking (bounded, so long tasks don't grow memory without limit)
+        self.state_history = deque(maxlen=MAX_HISTORY)
+        self.action_history = deque(maxlen=MAX_HISTORY)
+        
+        # Running counts used to name output files, since the histories are capped
+        self._state_count = 0
+        self._extract_count = 0
+        
+        # Full structured data for the most recent states, keyed by state index
+        # (state_history only keeps a compact digest of each state)
+        self._recent_structured: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
         
     def _setup_llm(self):
         """Configure LiteLLM with the provided API key."""
-        # Set default API keys based on model
-        if "gpt" in self.model_name.lower() or "openai" in self.model_name.lower():
-            os.environ["OPENAI_API_KEY"] = self.api_key
-        elif "claude" in self.model_name.lower():
-            os.environ["ANTHROPIC_API_KEY"] = self.api_key
-        elif "gemini" in self.model_name.lower():
-            os.environ["GOOGLE_API_KEY"] = self.api_key
-        else:
-            # For custom providers
-            if self.provider:
-                os.environ[f"{self.provider.upper()}_API_KEY"] = self.api_key
-            else:
-                # Default fallback
-                os.environ["LITELLM_API_KEY"] = self.api_key
-        
-        # Set safe defaults for LiteLLM
-        litellm.set_verbose = self.verbose
-        litellm.timeout = 60
+        configure_litellm(self.api_key, self.model_name, self.provider, verbose=self.verbose)
         
     async def capture_browser_state(self) -> Dict[str, Any]:
         """
@@ -94,22 +235,18 @@ class AIController:
         Returns:
             Dictionary containing browser state information
         """
-        # Get basic browser information
-        current_url = await self.automation.browser.get_current_url()
-        page_title = await self.automation.browser.get_page_title()
-        
-        # Take screenshot
-        screenshot_path = await self.automation.take_screenshot(
-            str(self.output_dir / f"state_{len(self.state_history)}.png")
+        state_index = self._state_count
+        self._state_count += 1
+        screenshot_file = self.output_dir / f"state_{state_index}.jpg"
+        
+        # None of these depend on each other, so let the round-trips overlap
+        current_url, page_title, screenshot_path, structured_data = await asyncio.gather(
+            self.automation.browser.get_current_url(),
+            self.automation.browser.get_page_title(),
+            self._save_screenshot(screenshot_file),
+            self._safe_extract_structured_data()
         )
-        
-        # Extract structured data
-        try:
-            structured_data = await self.automation.extract_all_structured_data()
-        except Exception as e:
-            logger.warning(f"Error extracting structured data: {e}")
-            structured_data = {}
-            
+
         # Create state object
         state = {
             "url": current_url,
@@ -119,15 +256,57 @@ class AIController:
             "timestamp": asyncio.get_event_loop().time()
         }
         
-        # Add to history
-        self.state_history.append(state)
+        # Keep only a digest in the history; the full data goes to a small LRU
+        self.state_history.append({
+            "index": state_index,
+            "url": current_url,
+            "title": page_title,
+            "screenshot_path": screenshot_path,
+            "timestamp": state["timestamp"],
+            "structured_data_size": len(structured_data)
+        })
+        self._recent_structured[state_index] = structured_data
+        if len(self._recent_structured) > RECENT_STRUCTURED_DATA:
+            self._recent_structured.popitem(last=False)
         
         return state
+
+    async def _save_screenshot(self, path: Path) -> str:
+        """
+        Take a screenshot of the current page and save it as JPEG.
         
-    async def _query_llm(self, 
+        Args:
+            path: The path to save the screenshot to
+            
+        Returns:
+            The path to the saved screenshot
+        """
+        jpeg = await self.automation.get_screenshot_bytes("jpeg", quality=JPEG_QUALITY)
+        if not jpeg.startswith(b"\xff\xd8"):
+            # Browsers that can only capture PNG are re-encoded here
+            jpeg = await asyncio.to_thread(screenshot_to_jpeg, jpeg)
+        async with aiofiles.open(path, "wb") as f:
+            await f.write(jpeg)
+        return str(path)
+
+    async def _safe_extract_structured_data(self) -> Dict[str, Any]:
+        """
+        Extract structured data from the current page, returning an empty dict on failure.
+
+        Returns:
+            Dictionary with the extracted structured data
+        """
+        try:
+            return await self.automation.extract_all_structured_data()
+        except Exception as e:
+            logger.warning(f"Error extracting structured data: {e}")
+            return {}
+
+    async def _query_llm(self,
                          prompt: str, 
                          image_paths: Optional[List[str]] = None, 
-                         system_message: Optional[str] = None) -> str:
+                         system_message: Optional[str] = None,
+                         cache_key: Optional[str] = None) -> str:
         """
         Query the LLM with a prompt and optional images.
         
@@ -135,6 +314,8 @@ class AIController:
             prompt: The text prompt to send to the LLM
             image_paths: Optional list of image file paths to include
             system_message: Optional system message for the LLM
+            cache_key: Optional key identifying the page inputs behind the prompt; together
+                with the images it keys the response cache (no caching when omitted)
             
         Returns:
             The response from the LLM
@@ -153,17 +334,21 @@ class AIController:
             # Create content list for user message
             content = [{"type": "text", "text": prompt}]
             
-            # Add images if provided
-            if image_paths and len(image_paths) > 0:
-                for image_path in image_paths:
-                    if os.path.exists(image_path):
-                        import base64
-                        with open(image_path, "rb") as img_file:
-                            base64_image = base64.b64encode(img_file.read()).decode("utf-8")
-                            content.append({
-                                "type": "image_url",
-                                "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}
-                            })
+            # Add images if provided (read and encoded concurrently; missing files are skipped)
+            image_urls = []
+            if image_paths:
+                encoded = await asyncio.gather(*[_encode_image(image_path) for image_path in image_paths])
+                image_urls = [url for url in encoded if url is not None]
+                content.extend({"type": "image_url", "image_url": {"url": url}} for url in image_urls)
+            
+            # Check for an earlier request about the same page
+            response_key = None
+            if cache_key is not None and self._response_cache is not None:
+                response_key = make_cache_key(self.model_name, system_message or "", cache_key, *image_urls)
+                cached_response = await self._response_cache.get(response_key)
+                if cached_response is not None:
+                    logger.debug("Using cached LLM response")
+                    return cached_response
             
             # Add user message
             messages.append({
@@ -171,28 +356,108 @@ class AIController:
                 "content": content
             })
             
-            # Generate response
-            response = await asyncio.to_thread(
-                lambda: litellm.completion(
+            # Generate response (through the shared pool if one is attached)
+            if self.pool is not None:
+                response = await self.pool.submit(self, messages)
+            else:
+                response = await self._complete(messages)
+            
+            # LiteLLM normalizes every provider to the OpenAI response shape
+            text = response.choices[0].message.content or ""
+            
+            if response_key is not None and text:
+                await self._response_cache.set(response_key, text)
+            return text
+            
+        except Exception as e:
+            logger.error(f"Error querying LLM: {e}")
+            return _dumps({"error": str(e)})
+            
+    async def _complete(self, messages: List[Dict[str, Any]]) -> Any:
+        """
+        Send a completion request for this controller's model.
+        
+        Rate limits and connection errors are retried with exponential backoff; the
+        last error is raised once all attempts have failed.
+        
+        Args:
+            messages: Chat messages to send
+            
+        Returns:
+            The LiteLLM response
+        """
+        for attempt in range(LLM_MAX_ATTEMPTS):
+            try:
+                return await litellm.acompletion(
                     model=self.model_name,
                     messages=messages,
+                    api_key=self.api_key,
                     temperature=0.2,
-                    max_tokens=2048
+                    max_tokens=2048,
+                    timeout=60
                 )
-            )
+            except RETRYABLE_LLM_ERRORS as e:
+                if attempt == LLM_MAX_ATTEMPTS - 1:
+                    raise
+                delay = LLM_RETRY_BASE_DELAY * 2 ** attempt
+                logger.warning(f"LLM request failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+        
+    @staticmethod
+    def _rank_data_items(structured_data: Dict[str, Any], task_description: str) -> List[str]:
+        """
+        Pick the structured-data entries most relevant to a task.
+        
+        Each item (a JSON-LD block, product, article, table row, ...) becomes one
+        compact line. Lines that share no keywords with the task are dropped, the
+        rest are ranked by how many they contain (ties keep page order), and only
+        the top entries are returned.
+        
+        Args:
+            structured_data: Output of extract_all_structured_data
+            task_description: Description of the task to accomplish
             
-            # Extract content from response
-            if hasattr(response, 'choices') and len(response.choices) > 0:
-                if hasattr(response.choices[0], 'message') and hasattr(response.choices[0].message, 'content'):
-                    return response.choices[0].message.content
+        Returns:
+            Compact text lines, most relevant first
+        """
+        entries = []
+        for category, value in structured_data.items():
+            if category == 'tables':
+                items = [row for table in value for row in table.get('data', [])]
+            elif isinstance(value, list):
+                items = value
+            else:
+                items = [value]
+                
+            for item in items:
+                if not item:
+                    continue
+                text = orjson.dumps(item, default=str).decode()[:MAX_DATA_ITEM_CHARS]
+                entries.append(f"{category}: {text}")
                 
-            # Fallback for different response structures
-            return str(response)
+        if not entries:
+            return []
             
-        except Exception as e:
-            logger.error(f"Error querying LLM: {e}")
-            return json.dumps({"error": str(e)})
+        keywords = set(_WORD_RE.findall(task_description.lower()))
+        scores = [len(keywords.intersection(_WORD_RE.findall(entry.lower()))) for entry in entries]
+        order = sorted((i for i in range(len(entries)) if scores[i] > 0), key=lambda i: -scores[i])
+        return [entries[i] for i in order[:MAX_PROMPT_DATA_ITEMS]]
+        
+    @staticmethod
+    def _parse_action(response: str) -> Dict[str, Any]:
+        """
+        Parse an action from an LLM response.
+        
+        Args:
+            response: Raw LLM output, possibly wrapped in ``` or ```json fences
             
+        Returns:
+            The decoded action
+        """
+        match = _FENCE_RE.search(response)
+        payload = match.group(1).strip() if match else response.strip()
+        return orjson.loads(payload)
+        
     async def analyze_and_suggest_action(self, 
                                        task_description: str, 
                                        state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -209,63 +474,30 @@ class AIController:
         if state is None:
             state = await self.capture_browser_state()
             
-        # Create system message
-        system_message = """
-        You are an AI assistant that helps with browser automation. Your task is to analyze the 
-        current state of a browser and suggest the next action to take to accomplish a given task.
-        
-        You should respond with a JSON object specifying the action to take. The actions you can suggest are:
-        1. {"action": "navigate", "url": "<url>"}
-        2. {"action": "click", "selector": "<css_selector>"}
-        3. {"action": "input", "selector": "<css_selector>", "text": "<text>"}
-        4. {"action": "extract", "extraction_config": {...}}
-        5. {"action": "wait", "seconds": <seconds>}
-        6. {"action": "scroll", "direction": "up|down|left|right", "amount": <pixels>}
-        7. {"action": "think", "reasoning": "<thinking step>"}
-        8. {"action": "complete", "result": "<task completion result>"}
-        
-        The "think" action is for when you need to reason through the next steps but aren't ready
-        to suggest a concrete browser action yet. Multiple "think" steps can be used, but try to
-        be efficient and don't exceed 3 thinking steps before taking action.
-        
-        The "complete" action is for when you believe the task is complete.
-        """
+        # Only the structured data most relevant to the task goes into the prompt
+        page_data = "\n".join(self._rank_data_items(state.get('structured_data') or {}, task_description)) or "None"
         
         # Create prompt
-        prompt = f"""
-        # Current Task
-        {task_description}
-        
-        # Current Browser State
-        URL: {state['url']}
-        Title: {state['title']}
-        
-        # Previous Actions
-        {json.dumps(self.action_history[-5:] if len(self.action_history) > 5 else self.action_history, indent=2)}
-        
-        The screenshot of the current page state is attached to this message.
-        
-        Analyze the current state and suggest the next action to take to accomplish the task.
-        Respond with a JSON object as specified. Don't use markdown for the JSON.
-        """
+        prompt = ACTION_PROMPT_TEMPLATE % (
+            task_description,
+            state['url'],
+            state['title'],
+            page_data,
+            _dumps(list(self.action_history)[-5:], indent=True)
+        )
         
-        # Get suggestion from LLM
+        # Get suggestion from LLM. The prompt embeds the recent actions, which change
+        # every step, so the response is cached by the page and task instead
         response = await self._query_llm(
             prompt=prompt, 
             image_paths=[state['screenshot_path']], 
-            system_message=system_message
+            system_message=self.SYSTEM_MESSAGE,
+            cache_key=make_cache_key(task_description, state['url'], state['title'])
         )
         
         # Parse response to get action
         try:
-            # Extract JSON from response (it might be wrapped in ```json ... ```)
-            json_str = response
-            if "```json" in response:
-                json_str = response.split("```json")[1].split("```")[0].strip()
-            elif "```" in response:
-                json_str = response.split("```")[1].split("```")[0].strip()
-                
-            action = json.loads(json_str)
+            action = self._parse_action(response)
             
             # Add to action history
             self.action_history.append(action)
@@ -294,110 +526,164 @@ class AIController:
             Dictionary with the result of the action
         """
         action_type = action.get("action", "")
+        handler = self._ACTION_HANDLERS.get(action_type)
+        if handler is None:
+            return {"success": False, "message": f"Unknown action type: {action_type}"}
+        return await handler(self, action)
         
-        # Navigate to URL
-        if action_type == "navigate":
-            url = action.get("url", "")
-            if not url:
-                return {"success": False, "message": "No URL provided"}
-                
-            try:
-                await self.automation.navigate_to(url)
-                return {"success": True, "message": f"Navigated to {url}"}
-            except Exception as e:
-                return {"success": False, "message": f"Error navigating to {url}: {str(e)}"}
-                
-        # Click on element
-        elif action_type == "click":
-            selector = action.get("selector", "")
-            if not selector:
-                return {"success": False, "message": "No selector provided"}
-                
-            try:
-                result = await self.automation.click(selector)
-                return {"success": result, "message": f"Clicked on {selector}" if result else f"Failed to click on {selector}"}
-            except Exception as e:
-                return {"success": False, "message": f"Error clicking on {selector}: {str(e)}"}
-                
-        # Input text
-        elif action_type == "input":
-            selector = action.get("selector", "")
-            text = action.get("text", "")
-            if not selector:
-                return {"success": False, "message": "No selector provided"}
-            if text is None:  # Allow empty string
-                return {"success": False, "message": "No text provided"}
-                
-            try:
-                result = await self.automation.input_text(selector, text)
-                return {"success": result, "message": f"Input text to {selector}" if result else f"Failed to input text to {selector}"}
-            except Exception as e:
-                return {"success": False, "message": f"Error inputting text to {selector}: {str(e)}"}
-                
-        # Extract data
-        elif action_type == "extract":
-            extraction_config = action.get("extraction_config", {})
-            if not extraction_config:
-                return {"success": False, "message": "No extraction configuration provided"}
-                
-            try:
-                data = await self.automation.extract_data(extraction_config)
-                
-                # Save data to file
-                output_file = self.output_dir / f"extracted_data_{len(self.action_history)}.json"
-                with open(output_file, "w") as f:
-                    json.dump(data, f, indent=2)
-                
-                return {"success": True, "message": f"Data extracted and saved to {output_file}", "data": data}
-            except Exception as e:
-                return {"success": False, "message": f"Error extracting data: {str(e)}"}
-                
-        # Wait for some time
-        elif action_type == "wait":
-            seconds = action.get("seconds", 1)
+    async def _do_navigate(self, action: Dict[str, Any]) -> Dict[str, Any]:
+        """Navigate to a URL."""
+        url = action.get("url", "")
+        if not url:
+            return {"success": False, "message": "No URL provided"}
             
-            try:
-                await asyncio.sleep(seconds)
-                return {"success": True, "message": f"Waited for {seconds} seconds"}
-            except Exception as e:
-                return {"success": False, "message": f"Error waiting: {str(e)}"}
-                
-        # Scroll the page
-        elif action_type == "scroll":
-            direction = action.get("direction", "down")
-            amount = action.get("amount", 300)
+        try:
+            await self.automation.navigate_to(url)
+            return {"success": True, "message": f"Navigated to {url}"}
+        except Exception as e:
+            return {"success": False, "message": f"Error navigating to {url}: {str(e)}"}
             
-            try:
-                # Translate direction to x,y coordinates
-                x, y = 0, 0
-                if direction == "down":
-                    y = amount
-                elif direction == "up":
-                    y = -amount
-                elif direction == "right":
-                    x = amount
-                elif direction == "left":
-                    x = -amount
-                
-                # Execute scroll using JavaScript
-                script = f"window.scrollBy({x}, {y});"
-                await self.automation.execute_script(script)
-                
-                return {"success": True, "message": f"Scrolled {direction} by {amount} pixels"}
-            except Exception as e:
-                return {"success": False, "message": f"Error scrolling: {str(e)}"}
-                
-        # Thinking step (no action)
-        elif action_type == "think":
-            return {"success": True, "message": "Thinking step completed", "thinking": action.get("reasoning", "")}
+    async def _do_click(self, action: Dict[str, Any]) -> Dict[str, Any]:
+        """Click on an element."""
+        selector = action.get("selector", "")
+        if not selector:
+            return {"success": False, "message": "No selector provided"}
+            
+        try:
+            result = await self.automation.click(selector)
+            return {"success": result, "message": f"Clicked on {selector}" if result else f"Failed to click on {selector}"}
+        except Exception as e:
+            return {"success": False, "message": f"Error clicking on {selector}: {str(e)}"}
+            
+    async def _do_input(self, action: Dict[str, Any]) -> Dict[str, Any]:
+        """Input text into an element."""
+        selector = action.get("selector", "")
+        text = action.get("text", "")
+        if not selector:
+            return {"success": False, "message": "No selector provided"}
+        if text is None:  # Allow empty string
+            return {"success": False, "message": "No text provided"}
+            
+        try:
+            result = await self.automation.input_text(selector, text)
+            return {"success": result, "message": f"Input text to {selector}" if result else f"Failed to input text to {selector}"}
+        except Exception as e:
+            return {"success": False, "message": f"Error inputting text to {selector}: {str(e)}"}
+            
+    async def _do_extract(self, action: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract data and save it to a file."""
+        extraction_config = action.get("extraction_config", {})
+        if not extraction_config:
+            return {"success": False, "message": "No extraction configuration provided"}
             
-        # Complete task
-        elif action_type == "complete":
-            return {"success": True, "message": "Task completed", "result": action.get("result", "")}
+        try:
+            data = await self.automation.extract_data(extraction_config)
+            
+            # Save data to file
+            output_file = self.output_dir / f"extracted_data_{self._extract_count}.json"
+            self._extract_count += 1
+            # Write the encoded bytes directly; str() covers any non-JSON values
+            async with aiofiles.open(output_file, "wb") as f:
+                await f.write(orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2))
+            
+            return {"success": True, "message": f"Data extracted and saved to {output_file}", "data": data}
+        except Exception as e:
+            return {"success": False, "message": f"Error extracting data: {str(e)}"}
+            
+    async def _do_wait(self, action: Dict[str, Any]) -> Dict[str, Any]:
+        """Wait for some time."""
+        seconds = action.get("seconds", 1)
         
-        # Unknown action
-        else:
-            return {"success": False, "message": f"Unknown action type: {action_type}"}
+        try:
+            await asyncio.sleep(seconds)
+            return {"success": True, "message": f"Waited for {seconds} seconds"}
+        except Exception as e:
+            return {"success": False, "message": f"Error waiting: {str(e)}"}
+            
+    async def _do_scroll(self, action: Dict[str, Any]) -> Dict[str, Any]:
+        """Scroll the page."""
+        direction = action.get("direction", "down")
+        amount = action.get("amount", 300)
+        
+        try:
+            amount = int(amount)
+            
+            # Translate direction to x,y coordinates
+            x, y = 0, 0
+            if direction == "down":
+                y = amount
+            elif direction == "up":
+                y = -amount
+            elif direction == "right":
+                x = amount
+            elif direction == "left":
+                x = -amount
+            
+            # Execute scroll using JavaScript; the offsets are passed as arguments so the
+            # script text stays constant and model output never becomes code
+            await self.automation.execute_script(SCROLL_BY_SCRIPT, x, y)
+            
+            return {"success": True, "message": f"Scrolled {direction} by {amount} pixels"}
+        except Exception as e:
+            return {"success": False, "message": f"Error scrolling: {str(e)}"}
+            
+    async def _do_think(self, action: Dict[str, Any]) -> Dict[str, Any]:
+        """Thinking step (no browser action)."""
+        return {"success": True, "message": "Thinking step completed", "thinking": action.get("reasoning", "")}
+        
+    async def _do_complete(self, action: Dict[str, Any]) -> Dict[str, Any]:
+        """Mark the task as complete."""
+        return {"success": True, "message": "Task completed", "result": action.get("result", "")}
+        
+    # Maps each action type returned by the LLM to the method that executes it
+    _ACTION_HANDLERS = {
+        "navigate": _do_navigate,
+        "click": _do_click,
+        "input": _do_input,
+        "extract": _do_extract,
+        "wait": _do_wait,
+        "scroll": _do_scroll,
+        "think": _do_think,
+        "complete": _do_complete,
+    }
+            
+    async def _settle_delay(self, action_type: str, previous_url: str) -> None:
+        """
+        Wait after an action until the page is ready for the next step.
+        
+        For actions that may load content, first waits briefly (up to
+        NAVIGATION_START_TIMEOUT) for a navigation to start, i.e. for the URL to
+        change or the document to leave the "complete" state, since the old page
+        still reports "complete" right after a click. If one starts, waits until
+        the new document has finished loading (capped at SETTLE_TIMEOUT). Returns
+        immediately for actions that don't touch the page.
+        
+        Args:
+            action_type: The type of the action that was just executed
+            previous_url: The page URL before the action
+        """
+        if action_type == "scroll":
+            await asyncio.sleep(SCROLL_SETTLE_DELAY)
+            return
+        if action_type not in ("navigate", "click", "input"):
+            return
+            
+        loop = asyncio.get_running_loop()
+        start_deadline = loop.time() + NAVIGATION_START_TIMEOUT
+        deadline = loop.time() + SETTLE_TIMEOUT
+        navigating = False
+        while True:
+            try:
+                url, ready_state = await self.automation.execute_script(PAGE_STATE_SCRIPT)
+            except Exception as e:
+                logger.debug(f"Error checking page readiness: {e}")
+                return
+            navigating = navigating or url != previous_url or ready_state != "complete"
+            if navigating and ready_state == "complete":
+                return
+            if loop.time() >= (deadline if navigating else start_deadline):
+                return
+            await asyncio.sleep(SETTLE_POLL_INTERVAL)
             
     async def run_task(self, task_description: str, max_actions: int = 20) -> Dict[str, Any]:
         """
@@ -425,7 +711,7 @@ class AIController:
             action_count += 1
             
             # Log action
-            logger.info(f"Action {action_count}: {json.dumps(action)}")
+            logger.info(f"Action {action_count}: {_dumps(action)}")
             
             # Check if we're just thinking
             if action.get("action") == "think":
@@ -450,14 +736,7 @@ class AIController:
                     )
                     
                     try:
-                        # Extract JSON from response
-                        json_str = response
-                        if "```json" in response:
-                            json_str = response.split("```json")[1].split("```")[0].strip()
-                        elif "```" in response:
-                            json_str = response.split("```")[1].split("```")[0].strip()
-                            
-                        action = json.loads(json_str)
+                        action = self._parse_action(response)
                         
                         # Add to action history
                         self.action_history.append(action)
@@ -482,19 +761,77 @@ class AIController:
                     "message": "Task completed successfully",
                     "result": action.get("result", ""),
                     "actions_taken": action_count,
-                    "action_history": self.action_history
+                    "action_history": list(self.action_history)
                 }
                 break
             
             # Execute action
             result = await self.execute_action(action)
-            logger.info(f"Action result: {json.dumps(result)}")
+            logger.info(f"Action result: {_dumps(result)}")
             
             # Add result to action for history
             action["result"] = result
             
-            # Wait a moment between actions
-            await asyncio.sleep(1)
+            # Wait for the page to settle before the next step
+            await self._settle_delay(action.get("action", ""), state['url'])
         
         # Task done or max actions reached
-        return final_result 
\ No newline at end of file
+        return final_result 
+
+
+class AIControllerPool:
+    """
+    Batches LLM requests from several AIController sessions.
+    
+    Requests submitted within a short window are dispatched together, and a shared
+    limit caps how many are in flight at once, so a fleet of agents running in
+    parallel doesn't overrun the provider's rate limits.
+    """
+    
+    def __init__(self,
+                 batch_size: int = 16,
+                 max_wait_ms: float = 100,
+                 max_concurrency: int = 8):
+        """
+        Initialize the pool.
+        
+        Args:
+            batch_size: Maximum number of requests dispatched in one batch
+            max_wait_ms: Maximum time to wait for a batch to fill up
+            max_concurrency: Maximum number of requests in flight at once
+        """
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._batcher = AsyncBatcher(self._complete_batch, max_batch_size=batch_size, max_wait_ms=max_wait_ms)
+        
+    async def submit(self, controller: AIController, messages: List[Dict[str, Any]]) -> Any:
+        """
+        Submit a completion request and wait for its response.
+        
+        Args:
+            controller: The controller the request belongs to
+            messages: Chat messages to send
+            
+        Returns:
+            The LiteLLM response
+        """
+        return await self._batcher.submit((controller, messages))
+        
+    async def _complete_batch(self, batch: List[Tuple[AIController, List[Dict[str, Any]]]]) -> List[Any]:
+        """
+        Run a batch of completion requests concurrently.
+        
+        Args:
+            batch: List of (controller, messages) tuples, one per request
+            
+        Returns:
+            One LiteLLM response (or exception) per request, in order
+        """
+        return await asyncio.gather(
+            *[self._complete(controller, messages) for controller, messages in batch],
+            return_exceptions=True
+        )
+        
+    async def _complete(self, controller: AIController, messages: List[Dict[str, Any]]) -> Any:
+        """Send one request once a concurrency slot is free."""
+        async with self._semaphore:
+            return await controller._complete(messages)
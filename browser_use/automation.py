@@ -1,16 +1,77 @@
 import asyncio
+import base64
 import logging
 import os
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
 
-from playwright.async_api import Page, async_playwright
+import aiofiles
+from playwright.async_api import Browser as PlaywrightBrowser
+from playwright.async_api import CDPSession, ElementHandle, Locator, Page, Playwright, async_playwright
 
 from browser_use.dom.service import DomService
+from browser_use.dom.views import DOMElementNode, DOMState, Selector
 from browser_use.ai.llm_controller import LLMController
 
 logger = logging.getLogger(__name__)
 
+# Playwright driver and Chromium instances shared by automations started with
+# reuse_context=True, keyed by headless mode
+_shared_playwright: Optional[Playwright] = None
+_shared_browsers: Dict[bool, PlaywrightBrowser] = {}
+_shared_lock = asyncio.Lock()
+
+
+async def _get_shared_browser(headless: bool) -> PlaywrightBrowser:
+    """
+    Get the shared Chromium instance, launching it on first use.
+    
+    Args:
+        headless: Whether the browser runs in headless mode
+        
+    Returns:
+        A connected Playwright browser
+    """
+    global _shared_playwright
+    async with _shared_lock:
+        if _shared_playwright is None:
+            _shared_playwright = await async_playwright().start()
+        
+        browser = _shared_browsers.get(headless)
+        if browser is None or not browser.is_connected():
+            browser = await _shared_playwright.chromium.launch(headless=headless)
+            _shared_browsers[headless] = browser
+        return browser
+
+
+async def close_shared_browsers() -> None:
+    """Close the shared Chromium instances and stop the shared Playwright driver."""
+    global _shared_playwright
+    async with _shared_lock:
+        for browser in _shared_browsers.values():
+            try:
+                await browser.close()
+            except Exception as e:
+                logger.warning(f"Error closing shared browser: {e}")
+        _shared_browsers.clear()
+        
+        if _shared_playwright is not None:
+            await _shared_playwright.stop()
+            _shared_playwright = None
+
+
+# Page functions used by Browser, registered as page globals by preload_scripts()
+_GET_TEXT_JS = "() => document.body ? (document.body.innerText || document.body.textContent || '') : ''"
+_SNAPSHOT_JS = """() => ({
+    text: document.body ? (document.body.innerText || document.body.textContent || '') : '',
+    title: document.title,
+    url: location.href
+})"""
+_PAGE_FUNCTIONS = {
+    "__buGetText": _GET_TEXT_JS,
+    "__buSnapshot": _SNAPSHOT_JS,
+}
+
 class Browser:
     """
     Browser wrapper class that provides common browser operations.
@@ -24,6 +85,10 @@ class Browser:
             page: The Playwright page object
         """
         self.page = page
+        self._preloaded = False
+        # CDP session for screenshots, opened on first use
+        self._cdp: Optional[CDPSession] = None
+        self._cdp_available = True
     
     async def get_page(self) -> Page:
         """
@@ -42,23 +107,76 @@ class Browser:
             url: The URL to navigate to
         """
         logger.info(f"Navigating to {url}")
-        await self.page.goto(url)
-        await self.page.wait_for_load_state("networkidle")
+        # The DOM is all the agent needs; waiting for network idle stalls on analytics beacons
+        await self.page.goto(url, wait_until="domcontentloaded")
     
-    async def take_screenshot(self, path: str) -> str:
+    async def take_screenshot(self, path: str, quality: int = 60) -> str:
         """
         Take a screenshot of the current page.
         
         Args:
             path: The path to save the screenshot to
+            quality: JPEG quality, used when the path has a .jpg/.jpeg extension
             
         Returns:
             The path to the saved screenshot
         """
         logger.info(f"Taking screenshot: {path}")
-        await self.page.screenshot(path=path)
+        if path.lower().endswith((".jpg", ".jpeg")):
+            data = await self._capture("jpeg", quality)
+        else:
+            data = await self._capture("png")
+        async with aiofiles.open(path, "wb") as f:
+            await f.write(data)
         return path
     
+    async def get_screenshot_bytes(self, full_page: bool = False) -> bytes:
+        """
+        Take a screenshot of the current page without writing it to disk.
+        
+        Args:
+            full_page: Whether to capture the full scrollable page
+            
+        Returns:
+            The PNG-encoded screenshot
+        """
+        if full_page:
+            return await self.page.screenshot(full_page=True)
+        return await self._capture("png")
+    
+    async def _capture(self, image_type: str, quality: Optional[int] = None) -> bytes:
+        """
+        Capture the viewport with a single CDP Page.captureScreenshot call.
+        
+        This skips the work Playwright's screenshot() does around the capture (waiting
+        for fonts, freezing animations, hiding the caret). Browsers without CDP fall
+        back to screenshot().
+        
+        Args:
+            image_type: "png" or "jpeg"
+            quality: JPEG quality (ignored for PNG)
+            
+        Returns:
+            The encoded screenshot
+        """
+        if self._cdp is None and self._cdp_available:
+            try:
+                self._cdp = await self.page.context.new_cdp_session(self.page)
+            except Exception as e:
+                logger.debug(f"CDP unavailable, using Playwright screenshots: {e}")
+                self._cdp_available = False
+        
+        if self._cdp is not None:
+            params: Dict[str, Any] = {"format": image_type}
+            if image_type == "jpeg" and quality is not None:
+                params["quality"] = quality
+            result = await self._cdp.send("Page.captureScreenshot", params)
+            return base64.b64decode(result["data"])
+        
+        if image_type == "jpeg":
+            return await self.page.screenshot(type="jpeg", quality=quality, animations="disabled", caret="hide")
+        return await self.page.screenshot(animations="disabled", caret="hide")
+    
     async def get_page_content(self) -> str:
         """
         Get the text content of the current page.
@@ -67,16 +185,55 @@ class Browser:
             The page text content
         """
         try:
-            content = await self.page.evaluate("""
-                () => {
-                    return document.body.innerText || document.body.textContent || '';
-                }
-            """)
-            return content
+            return await self._call_page_function("__buGetText", _GET_TEXT_JS)
         except Exception as e:
             logger.warning(f"Error getting page content: {e}")
             return ""
     
+    async def get_page_snapshot(self) -> Dict[str, str]:
+        """
+        Get the text content, title and URL of the current page in one round trip.
+        
+        Returns:
+            Dictionary with "text", "title" and "url" keys
+        """
+        try:
+            return await self._call_page_function("__buSnapshot", _SNAPSHOT_JS)
+        except Exception as e:
+            logger.warning(f"Error getting page snapshot: {e}")
+            return {"text": "", "title": "", "url": self.page.url}
+    
+    async def preload_scripts(self) -> None:
+        """
+        Register the page functions used by this wrapper as init scripts.
+        
+        Every document loaded afterwards defines them as page globals, so calls only
+        send a short invocation instead of the function source.
+        """
+        for name, source in _PAGE_FUNCTIONS.items():
+            await self.page.add_init_script(f"window.{name} = {source};")
+        self._preloaded = True
+    
+    async def _call_page_function(self, name: str, source: str) -> Any:
+        """
+        Call a preloaded page function, sending its source only if it isn't defined.
+        
+        Args:
+            name: The page global the function is registered under
+            source: The function source, used when the global is missing
+            
+        Returns:
+            The function's return value
+        """
+        if self._preloaded:
+            result = await self.page.evaluate(
+                f"() => typeof window.{name} === 'function' ? [window.{name}()] : null"
+            )
+            if result is not None:
+                return result[0]
+        # Not preloaded, or the document predates the init script
+        return await self.page.evaluate(source)
+    
     async def get_current_url(self) -> str:
         """
         Get the current URL.
@@ -95,51 +252,91 @@ class Browser:
         """
         return await self.page.title()
     
-    async def click(self, selector: str) -> bool:
+    @staticmethod
+    def _resolve_selector(selector: Union[str, Selector]) -> str:
+        """
+        Convert a selector to Playwright's selector syntax.
+        
+        Args:
+            selector: A typed ("css" | "xpath", value) selector, or a plain string
+                that is treated as XPath when it starts with "//"
+            
+        Returns:
+            The selector string to pass to Playwright
+        """
+        if isinstance(selector, tuple):
+            kind, value = selector
+            return f"xpath={value}" if kind == "xpath" else value
+        return f"xpath={selector}" if selector.startswith("//") else selector
+    
+    async def click(self, selector: Union[str, Selector]) -> bool:
         """
         Click on an element.
         
         Args:
-            selector: CSS selector or XPath to the element
+            selector: Typed selector, or a CSS selector or XPath string
             
         Returns:
             True if successful, False otherwise
         """
         try:
-            if selector.startswith("//"):
-                # XPath
-                await self.page.click(f"xpath={selector}")
-            else:
-                # CSS selector
-                await self.page.click(selector)
+            await self.page.click(self._resolve_selector(selector))
             return True
         except Exception as e:
             logger.warning(f"Error clicking element {selector}: {e}")
             return False
     
-    async def input_text(self, selector: str, text: str) -> bool:
+    async def input_text(self, selector: Union[str, Selector], text: str) -> bool:
         """
         Input text into an element.
         
         Args:
-            selector: CSS selector or XPath to the element
+            selector: Typed selector, or a CSS selector or XPath string
             text: Text to input
             
         Returns:
             True if successful, False otherwise
         """
         try:
-            if selector.startswith("//"):
-                # XPath
-                await self.page.fill(f"xpath={selector}", text)
-            else:
-                # CSS selector
-                await self.page.fill(selector, text)
+            await self.page.fill(self._resolve_selector(selector), text)
             return True
         except Exception as e:
             logger.warning(f"Error inputting text to {selector}: {e}")
             return False
     
+    async def bulk_query(self, selectors: List[str]) -> List[List[ElementHandle]]:
+        """
+        Find the elements matching each of several CSS selectors in one DOM traversal.
+        
+        The selectors are joined into a single querySelectorAll call and each match is
+        assigned back to the selectors it satisfies, so the number of round trips does
+        not grow with the number of selectors.
+        
+        Args:
+            selectors: CSS selectors to look up (all must be valid)
+            
+        Returns:
+            One list of element handles per selector, in document order
+        """
+        if not selectors:
+            return []
+        
+        result = await self.page.evaluate_handle("""
+            (selectors) => {
+                const nodes = Array.from(document.querySelectorAll(selectors.join(',')));
+                const groups = selectors.map(selector =>
+                    nodes.flatMap((node, index) => node.matches(selector) ? [index] : [])
+                );
+                return {nodes, groups};
+            }
+        """, selectors)
+        try:
+            groups = await (await result.get_property("groups")).json_value()
+            nodes = await (await result.get_property("nodes")).get_properties()
+            return [[nodes[str(index)].as_element() for index in group] for group in groups]
+        finally:
+            await result.dispose()
+    
     async def scroll(self, x: int = 0, y: int = 0) -> bool:
         """
         Scroll the page.
@@ -158,6 +355,17 @@ class Browser:
             logger.warning(f"Error scrolling page: {e}")
             return False
 
+# Unit x,y scroll vector for each direction the LLM can ask for
+_SCROLL_VECTORS = {
+    "down": (0, 1),
+    "up": (0, -1),
+    "right": (1, 0),
+    "left": (-1, 0),
+}
+
+# Resource types that are aborted when media blocking is enabled
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+
 class BrowserAutomation:
     """
     Browser automation class that can execute commands from AI models
@@ -171,7 +379,9 @@ class BrowserAutomation:
                  headless: bool = False, 
                  output_dir: str = "output",
                  viewport_width: int = 1280,
-                 viewport_height: int = 720):
+                 viewport_height: int = 720,
+                 reuse_context: bool = False,
+                 block_media: bool = False):
         """
         Initialize the browser automation class.
         
@@ -183,6 +393,10 @@ class BrowserAutomation:
             output_dir: Directory to save screenshots and other outputs
             viewport_width: Browser viewport width
             viewport_height: Browser viewport height
+            reuse_context: Run in a new context of a Chromium instance shared with other
+                automations instead of launching a dedicated browser
+            block_media: Abort image, media and font requests so pages load faster.
+                Screenshots then show pages without those resources
         """
         self.api_key = api_key
         self.model_name = model_name
@@ -191,37 +405,61 @@ class BrowserAutomation:
         self.output_dir = Path(output_dir)
         self.viewport_width = viewport_width
         self.viewport_height = viewport_height
+        self.reuse_context = reuse_context
+        self.block_media = block_media
         
         # Create output directory if it doesn't exist
         self.output_dir.mkdir(exist_ok=True)
         
+        # Screenshot files are overwritten on every command instead of creating new ones
+        self._before_screenshot_path = str(self.output_dir / "current_page.png")
+        self._after_screenshot_path = str(self.output_dir / "after_action.jpg")
+        
         # Initialize state variables
         self.playwright = None
         self.browser_instance = None
+        self.context = None
         self.page = None
         self.browser = None
         self.dom_service = None
         self.llm_controller = None
+        
+        # "After" screenshot still being written in the background
+        self._after_screenshot_task: Optional[asyncio.Task] = None
     
     async def start(self) -> None:
         """Start the browser and initialize controllers."""
-        # Initialize Playwright
-        self.playwright = await async_playwright().start()
-        
-        # Launch browser
-        self.browser_instance = await self.playwright.chromium.launch(headless=self.headless)
-        
-        # Create a page with specified viewport
-        self.page = await self.browser_instance.new_page(viewport={
+        viewport = {
             "width": self.viewport_width, 
             "height": self.viewport_height
-        })
+        }
+        
+        if self.reuse_context:
+            # An isolated context in the shared browser skips the Chromium launch
+            shared_browser = await _get_shared_browser(self.headless)
+            self.context = await shared_browser.new_context(viewport=viewport)
+            self.page = await self.context.new_page()
+        else:
+            # Initialize Playwright
+            self.playwright = await async_playwright().start()
+            
+            # Launch browser
+            self.browser_instance = await self.playwright.chromium.launch(headless=self.headless)
+            
+            # Create a page with specified viewport
+            self.page = await self.browser_instance.new_page(viewport=viewport)
+        
+        if self.block_media:
+            # Routing is only installed when needed, since it intercepts every request
+            await self.page.route("**/*", self._route_request)
         
         # Initialize browser wrapper
         self.browser = Browser(self.page)
+        await self.browser.preload_scripts()
         
-        # Initialize DOM service
+        # Initialize DOM service, registering the extraction script with the page up front
         self.dom_service = DomService(self.page)
+        await self.dom_service.preload()
         
         # Initialize LLM controller
         self.llm_controller = LLMController(
@@ -232,16 +470,39 @@ class BrowserAutomation:
         
         logger.info("Browser automation started")
     
+    @staticmethod
+    async def _route_request(route) -> None:
+        """
+        Abort requests for heavy resources the AI loop doesn't need.
+        
+        Args:
+            route: The intercepted Playwright route
+        """
+        if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
+    
     async def stop(self) -> None:
         """Stop the browser and clean up resources."""
+        await self.flush_screenshots()
+        if self.context:
+            # Only this automation's context is closed; the shared browser stays up
+            await self.context.close()
+            self.context = None
         if self.browser_instance:
             await self.browser_instance.close()
         if self.playwright:
             await self.playwright.stop()
         
-        # Clean up
+        # Clean up so a stopped automation can't be used by accident, and so a second
+        # stop() doesn't try to close the browser or Playwright again
+        self.playwright = None
+        self.browser_instance = None
         self.browser = None
         self.page = None
+        self.dom_service = None
+        self.llm_controller = None
         
         logger.info("Browser automation stopped")
     
@@ -283,7 +544,7 @@ class BrowserAutomation:
             raise RuntimeError("Browser not started. Call start() first.")
         
         # Take a screenshot for AI to analyze
-        screenshot_path = str(self.output_dir / "current_page.jpg")
+        screenshot_path = self._before_screenshot_path
         
         # Get action recommendation from AI
         action = await self.llm_controller.analyze_page(
@@ -297,18 +558,22 @@ class BrowserAutomation:
             logger.error(f"AI returned an error: {action['error']}")
             return {"status": "error", "message": action["error"]}
         
-        # Execute the action
-        result = await self._execute_action(action)
+        # Execute the action against the DOM state the AI just analyzed
+        result = await self._execute_action(action, self.llm_controller.last_dom_state)
         
-        # After action, wait for any navigation or load state change
+        # After action, wait for any navigation to produce a usable DOM
         try:
-            await self.page.wait_for_load_state("networkidle", timeout=3000)
-        except:
+            await self.page.wait_for_load_state("domcontentloaded", timeout=1500)
+        except Exception:
             pass  # Ignore timeout
         
-        # Take an "after" screenshot
-        after_screenshot_path = str(self.output_dir / "after_action.jpg")
-        await self.page.screenshot(path=after_screenshot_path)
+        # Take an "after" screenshot in the background; it overlaps with whatever the
+        # caller does next and is awaited by flush_screenshots() before it is reused
+        after_screenshot_path = self._after_screenshot_path
+        await self.flush_screenshots()
+        self._after_screenshot_task = asyncio.create_task(
+            self.browser.take_screenshot(after_screenshot_path, quality=40)  # Only kept for debugging
+        )
         
         return {
             "status": "success",
@@ -318,81 +583,124 @@ class BrowserAutomation:
             "after_screenshot": after_screenshot_path
         }
     
+    async def flush_screenshots(self) -> None:
+        """Wait until the last "before" and "after" screenshots have been written to disk."""
+        if self.dom_service is not None:
+            await self.dom_service.flush_writes()
+        
+        task, self._after_screenshot_task = self._after_screenshot_task, None
+        if task is None:
+            return
+        try:
+            await task
+        except Exception as e:
+            logger.warning(f"Error taking after-action screenshot: {e}")
+    
     # For backward compatibility
     async def execute_gemini_command(self, task_description: str) -> Dict[str, Any]:
         """Alias for execute_ai_command for backward compatibility."""
         return await self.execute_ai_command(task_description)
     
-    async def _execute_action(self, action: Dict[str, Any]) -> Dict[str, Any]:
+    async def _execute_action(self, action: Dict[str, Any], dom_state: Optional[DOMState] = None) -> Dict[str, Any]:
         """
         Execute a browser action based on AI's recommendation.
         
         Args:
             action: Dictionary with the action to execute
+            dom_state: DOM state the action was chosen from (re-read from the page if None)
             
         Returns:
             Result of the action
         """
-        # Click an element
-        if "click_element" in action:
-            element_index = action["click_element"]["index"]
-            logger.info(f"Clicking element with index {element_index}")
+        for action_name, params in action.items():
+            handler = self._ACTION_HANDLERS.get(action_name) or self._ACTION_HANDLERS.get(action_name.lower())
+            if handler is not None:
+                return await handler(self, params, dom_state)
+        
+        unsupported_action = next(iter(action), "unknown")
+        logger.warning(f"Unsupported action: {unsupported_action}")
+        return {"error": f"Unsupported action: {unsupported_action}"}
+    
+    async def _click_element(self, params: Dict[str, Any], dom_state: Optional[DOMState]) -> Dict[str, Any]:
+        """Click the element with the given index."""
+        element_index = params["index"]
+        logger.info(f"Clicking element with index {element_index}")
+        if dom_state is None:
             success = await self.dom_service.click_element(element_index)
             return {"clicked": success}
         
-        # Input text
-        elif "input_text" in action:
-            element_index = action["input_text"]["index"]
-            text = action["input_text"]["text"]
-            logger.info(f"Inputting text '{text}' into element with index {element_index}")
-            
-            # Get the element from the DOM state
+        # Click the element from the analyzed DOM state without enumerating the page again
+        element = dom_state.selector_map.get(element_index)
+        if element is None:
+            return {"clicked": False}
+        try:
+            await self._element_locator(element).click(timeout=2000)
+            return {"clicked": True}
+        except Exception as e:
+            logger.error(f"Error clicking element with xpath {element.xpath}: {e}")
+            return {"clicked": False}
+    
+    async def _input_text(self, params: Dict[str, Any], dom_state: Optional[DOMState]) -> Dict[str, Any]:
+        """Type text into the element with the given index."""
+        element_index = params["index"]
+        text = params["text"]
+        logger.info(f"Inputting text '{text}' into element with index {element_index}")
+        
+        # Get the element from the DOM state
+        if dom_state is None:
             dom_state = await self.dom_service.get_clickable_elements()
-            if element_index in dom_state.selector_map:
-                element = dom_state.selector_map[element_index]
-                xpath = element.xpath
-                
-                try:
-                    # Focus on the element by xpath
-                    element_handle = await self.page.wait_for_selector(f"xpath={xpath}", timeout=2000)
-                    if element_handle:
-                        await element_handle.click()
-                        await self.page.keyboard.type(text)
-                        return {"typed": True}
-                except Exception as e:
-                    logger.error(f"Error typing text: {e}")
-            
-            return {"typed": False}
-        
-        # Navigate to URL
-        elif "go_to_url" in action:
-            url = action["go_to_url"]["url"]
-            logger.info(f"Navigating to URL: {url}")
-            await self.navigate_to(url)
-            return {"navigated": True}
-        
-        # Scroll the page
-        elif "scroll" in action:
-            direction = action["scroll"]["direction"]
-            amount = action["scroll"]["amount"]
-            logger.info(f"Scrolling {direction} by {amount} pixels")
+        if element_index in dom_state.selector_map:
+            element = dom_state.selector_map[element_index]
             
-            # Convert direction to x,y coordinates
-            x, y = 0, 0
-            if direction == "down":
-                y = amount
-            elif direction == "up":
-                y = -amount
-            elif direction == "right":
-                x = amount
-            elif direction == "left":
-                x = -amount
-            
-            # Execute the scroll
-            await self.page.mouse.wheel(x=x, y=y)
-            return {"scrolled": True}
+            try:
+                # fill() waits for the element, focuses it and sets the value in one command
+                await self._element_locator(element).fill(text, timeout=2000)
+                return {"typed": True}
+            except Exception as e:
+                logger.error(f"Error typing text: {e}")
+        
+        return {"typed": False}
+    
+    def _element_locator(self, element: DOMElementNode) -> Locator:
+        """
+        Get a locator for an element found by DOM extraction.
         
-        else:
-            unsupported_action = list(action.keys())[0] if action else "unknown"
-            logger.warning(f"Unsupported action: {unsupported_action}")
-            return {"error": f"Unsupported action: {unsupported_action}"} 
\ No newline at end of file
+        Uses the element's typed selector, so elements stamped with a data-buid
+        attribute are matched with an attribute selector, which browsers resolve
+        much faster than an XPath walk.
+        
+        Args:
+            element: The element to locate
+            
+        Returns:
+            A Playwright locator for the element
+        """
+        return self.page.locator(Browser._resolve_selector(element.selector))
+    
+    async def _go_to_url(self, params: Dict[str, Any], dom_state: Optional[DOMState]) -> Dict[str, Any]:
+        """Navigate to the given URL."""
+        url = params["url"]
+        logger.info(f"Navigating to URL: {url}")
+        await self.navigate_to(url)
+        return {"navigated": True}
+    
+    async def _scroll(self, params: Dict[str, Any], dom_state: Optional[DOMState]) -> Dict[str, Any]:
+        """Scroll the page in the given direction."""
+        direction = params["direction"].lower()
+        amount = int(params["amount"])
+        logger.info(f"Scrolling {direction} by {amount} pixels")
+        
+        # Convert direction to x,y coordinates (unknown directions don't scroll)
+        dx, dy = _SCROLL_VECTORS.get(direction, (0, 0))
+        
+        # One scrollBy call moves the page directly instead of emulating wheel events
+        await self.page.evaluate("([x, y]) => window.scrollBy(x, y)", [dx * amount, dy * amount])
+        return {"scrolled": True}
+    
+    # Maps each action name returned by the LLM to the method that executes it
+    _ACTION_HANDLERS = {
+        "click_element": _click_element,
+        "input_text": _input_text,
+        "go_to_url": _go_to_url,
+        "scroll": _scroll,
+    }
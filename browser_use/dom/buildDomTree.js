@@ -185,8 +185,74 @@
   
     const ID = { current: 0 };
   
+    // Interactive elements are stamped with a data-buid attribute so they can be
+    // found again with a cheap attribute selector. The per-run prefix keeps stamps
+    // left over from earlier runs from ever matching.
+    const BUID_PREFIX = Date.now().toString(36) + Math.random().toString(36).slice(2, 6);
+  
     const HIGHLIGHT_CONTAINER_ID = "playwright-highlight-container";
   
+    const HIGHLIGHT_LABEL_WIDTH = 20;
+    const HIGHLIGHT_LABEL_HEIGHT = 16;
+  
+    /**
+     * Places a highlight's overlay and label over its element.
+     */
+    function positionHighlight(entry, rect, iframeRect) {
+      const top = rect.top + (iframeRect ? iframeRect.top : 0);
+      const left = rect.left + (iframeRect ? iframeRect.left : 0);
+  
+      entry.overlay.style.top = `${top}px`;
+      entry.overlay.style.left = `${left}px`;
+      entry.overlay.style.width = `${rect.width}px`;
+      entry.overlay.style.height = `${rect.height}px`;
+  
+      let labelTop = top + 2;
+      let labelLeft = left + rect.width - HIGHLIGHT_LABEL_WIDTH - 2;
+  
+      if (rect.width < HIGHLIGHT_LABEL_WIDTH + 4 || rect.height < HIGHLIGHT_LABEL_HEIGHT + 4) {
+        labelTop = top - HIGHLIGHT_LABEL_HEIGHT - 2;
+        labelLeft = left + rect.width - HIGHLIGHT_LABEL_WIDTH;
+      }
+  
+      entry.label.style.top = `${labelTop}px`;
+      entry.label.style.left = `${labelLeft}px`;
+    }
+  
+    /**
+     * Registers one scroll/resize listener for all highlights in the container.
+     *
+     * Updates are batched into a single animation frame that reads every rect
+     * before writing any styles, instead of each highlight having its own
+     * listeners that interleave layout reads and writes. The listener removes
+     * itself once the container has been taken out of the page.
+     */
+    function watchHighlights(container) {
+      container._highlightEntries = [];
+      let frame = null;
+  
+      const update = () => {
+        if (!container.isConnected) {
+          window.removeEventListener('scroll', update);
+          window.removeEventListener('resize', update);
+          return;
+        }
+        if (frame !== null) return;
+        frame = requestAnimationFrame(() => {
+          frame = null;
+          const entries = container._highlightEntries;
+          const rects = entries.map((entry) => [
+            entry.element.getBoundingClientRect(),
+            entry.parentIframe ? entry.parentIframe.getBoundingClientRect() : null,
+          ]);
+          entries.forEach((entry, i) => positionHighlight(entry, rects[i][0], rects[i][1]));
+        });
+      };
+  
+      window.addEventListener('scroll', update);
+      window.addEventListener('resize', update);
+    }
+  
     /**
      * Highlights an element in the DOM and returns the index of the next element.
      */
@@ -208,6 +274,9 @@
           container.style.zIndex = "2147483647";
           document.body.appendChild(container);
         }
+        if (!container._highlightEntries) {
+          watchHighlights(container);
+        }
   
         // Get element position
         const rect = measureDomOperation(
@@ -244,26 +313,7 @@
         overlay.style.pointerEvents = "none";
         overlay.style.boxSizing = "border-box";
   
-        // Get element position
-        let iframeOffset = { x: 0, y: 0 };
-  
-        // If element is in an iframe, calculate iframe offset
-        if (parentIframe) {
-          const iframeRect = parentIframe.getBoundingClientRect();
-          iframeOffset.x = iframeRect.left;
-          iframeOffset.y = iframeRect.top;
-        }
-  
-        // Calculate position
-        const top = rect.top + iframeOffset.y;
-        const left = rect.left + iframeOffset.x;
-  
-        overlay.style.top = `${top}px`;
-        overlay.style.left = `${left}px`;
-        overlay.style.width = `${rect.width}px`;
-        overlay.style.height = `${rect.height}px`;
-  
-        // Create and position label
+        // Create label
         const label = document.createElement("div");
         label.className = "playwright-highlight-label";
         label.style.position = "fixed";
@@ -274,57 +324,17 @@
         label.style.fontSize = `${Math.min(12, Math.max(8, rect.height / 2))}px`;
         label.textContent = index;
   
-        const labelWidth = 20;
-        const labelHeight = 16;
-  
-        let labelTop = top + 2;
-        let labelLeft = left + rect.width - labelWidth - 2;
-  
-        if (rect.width < labelWidth + 4 || rect.height < labelHeight + 4) {
-          labelTop = top - labelHeight - 2;
-          labelLeft = left + rect.width - labelWidth;
-        }
-  
-        label.style.top = `${labelTop}px`;
-        label.style.left = `${labelLeft}px`;
+        const entry = { element, parentIframe, overlay, label };
+        positionHighlight(
+          entry,
+          rect,
+          parentIframe ? parentIframe.getBoundingClientRect() : null
+        );
   
-        // Add to container
+        // Add to container; its shared listener keeps the entry positioned on scroll
         container.appendChild(overlay);
         container.appendChild(label);
-  
-        // Update positions on scroll
-        const updatePositions = () => {
-          const newRect = element.getBoundingClientRect();
-          let newIframeOffset = { x: 0, y: 0 };
-  
-          if (parentIframe) {
-            const iframeRect = parentIframe.getBoundingClientRect();
-            newIframeOffset.x = iframeRect.left;
-            newIframeOffset.y = iframeRect.top;
-          }
-  
-          const newTop = newRect.top + newIframeOffset.y;
-          const newLeft = newRect.left + newIframeOffset.x;
-  
-          overlay.style.top = `${newTop}px`;
-          overlay.style.left = `${newLeft}px`;
-          overlay.style.width = `${newRect.width}px`;
-          overlay.style.height = `${newRect.height}px`;
-  
-          let newLabelTop = newTop + 2;
-          let newLabelLeft = newLeft + newRect.width - labelWidth - 2;
-  
-          if (newRect.width < labelWidth + 4 || newRect.height < labelHeight + 4) {
-            newLabelTop = newTop - labelHeight - 2;
-            newLabelLeft = newLeft + newRect.width - labelWidth;
-          }
-  
-          label.style.top = `${newLabelTop}px`;
-          label.style.left = `${newLabelLeft}px`;
-        };
-  
-        window.addEventListener('scroll', updatePositions);
-        window.addEventListener('resize', updatePositions);
+        container._highlightEntries.push(entry);
   
         return index + 1;
       } finally {
@@ -332,43 +342,70 @@
       }
     }
   
+    // XPaths and same-tag sibling positions computed during this run. Every element
+    // gets an XPath, so each path is built from its parent's cached path and each
+    // parent's children are indexed in one pass, instead of walking all ancestors
+    // and their previous siblings again for every element.
+    const XPATH_CACHE = new WeakMap();
+    const SIBLING_INDEX_CACHE = new WeakMap();
+  
+    /**
+     * Returns the position of an element among its parent's children with the same tag.
+     */
+    function getSiblingIndex(element) {
+      const parent = element.parentNode;
+      if (!parent) return 0;
+  
+      let indexes = SIBLING_INDEX_CACHE.get(parent);
+      if (!indexes) {
+        indexes = new Map();
+        const counts = new Map();
+        for (let child = parent.firstChild; child; child = child.nextSibling) {
+          if (child.nodeType === Node.ELEMENT_NODE) {
+            const count = counts.get(child.nodeName) || 0;
+            indexes.set(child, count);
+            counts.set(child.nodeName, count + 1);
+          }
+        }
+        SIBLING_INDEX_CACHE.set(parent, indexes);
+      }
+      return indexes.get(element) || 0;
+    }
+  
     /**
      * Returns an XPath tree string for an element.
      */
     function getXPathTree(element, stopAtBoundary = true) {
-      const segments = [];
-      let currentElement = element;
+      if (!element || element.nodeType !== Node.ELEMENT_NODE) {
+        return "";
+      }
   
-      while (currentElement && currentElement.nodeType === Node.ELEMENT_NODE) {
-        // Stop if we hit a shadow root or iframe
-        if (
-          stopAtBoundary &&
-          (currentElement.parentNode instanceof ShadowRoot ||
-            currentElement.parentNode instanceof HTMLIFrameElement)
-        ) {
-          break;
-        }
+      // Stop if we hit a shadow root or iframe
+      if (
+        stopAtBoundary &&
+        (element.parentNode instanceof ShadowRoot ||
+          element.parentNode instanceof HTMLIFrameElement)
+      ) {
+        return "";
+      }
   
-        let index = 0;
-        let sibling = currentElement.previousSibling;
-        while (sibling) {
-          if (
-            sibling.nodeType === Node.ELEMENT_NODE &&
-            sibling.nodeName === currentElement.nodeName
-          ) {
-            index++;
-          }
-          sibling = sibling.previousSibling;
-        }
+      if (stopAtBoundary) {
+        const cached = XPATH_CACHE.get(element);
+        if (cached !== undefined) return cached;
+      }
   
-        const tagName = currentElement.nodeName.toLowerCase();
-        const xpathIndex = index > 0 ? `[${index + 1}]` : "";
-        segments.unshift(`${tagName}${xpathIndex}`);
+      const index = getSiblingIndex(element);
+      const tagName = element.nodeName.toLowerCase();
+      const xpathIndex = index > 0 ? `[${index + 1}]` : "";
+      const segment = `${tagName}${xpathIndex}`;
   
-        currentElement = currentElement.parentNode;
-      }
+      const parentPath = getXPathTree(element.parentNode, stopAtBoundary);
+      const xpath = parentPath ? `${parentPath}/${segment}` : segment;
   
-      return segments.join("/");
+      if (stopAtBoundary) {
+        XPATH_CACHE.set(element, xpath);
+      }
+      return xpath;
     }
   
     /**
@@ -923,9 +960,45 @@
           if (nodeData.isTopElement) {
             nodeData.isInteractive = isInteractiveElement(node);
             if (nodeData.isInteractive) {
-              nodeData.isInViewport = true;
+              nodeData.isInViewport = false;
               nodeData.highlightIndex = highlightIndex++;
   
+              const buid = `${BUID_PREFIX}-${nodeData.highlightIndex}`;
+              node.setAttribute('data-buid', buid);
+              nodeData.attributes['data-buid'] = buid;
+  
+              // Record the element's position so highlights can be drawn on the screenshot
+              const rect = getCachedBoundingRect(node);
+              if (rect) {
+                let offsetX = 0;
+                let offsetY = 0;
+                if (parentIframe) {
+                  const iframeRect = getCachedBoundingRect(parentIframe);
+                  offsetX = iframeRect.left;
+                  offsetY = iframeRect.top;
+                }
+                nodeData.viewportCoordinates = {
+                  x: rect.left + offsetX,
+                  y: rect.top + offsetY,
+                  width: rect.width,
+                  height: rect.height,
+                };
+                nodeData.pageCoordinates = {
+                  x: rect.left + offsetX + window.scrollX,
+                  y: rect.top + offsetY + window.scrollY,
+                  width: rect.width,
+                  height: rect.height,
+                };
+                // Whether any part of the element is inside the visible viewport
+                const viewportRect = nodeData.viewportCoordinates;
+                nodeData.isInViewport = (
+                  viewportRect.x < window.innerWidth &&
+                  viewportRect.x + viewportRect.width > 0 &&
+                  viewportRect.y < window.innerHeight &&
+                  viewportRect.y + viewportRect.height > 0
+                );
+              }
+  
               if (doHighlightElements) {
                 if (focusHighlightIndex >= 0) {
                   if (focusHighlightIndex === nodeData.highlightIndex) {
@@ -1011,6 +1084,12 @@
     isTextNodeVisible = measureTime(isTextNodeVisible);
     getEffectiveScroll = measureTime(getEffectiveScroll);
   
+    if (doHighlightElements) {
+      // Indices restart on every run, so drop the highlights of the previous run
+      const previousHighlights = document.getElementById(HIGHLIGHT_CONTAINER_ID);
+      if (previousHighlights) previousHighlights.remove();
+    }
+  
     const rootId = buildDomTree(document.body);
   
     // Clear the cache before starting
@@ -0,0 +1,101 @@
+"""
+Draw element highlight boxes onto screenshots.
+
+Drawing the boxes on the captured image avoids injecting one overlay element (plus
+scroll and resize listeners) per interactive element into the page.
+"""
+
+import io
+import logging
+from functools import lru_cache
+from typing import Iterable
+
+from PIL import Image, ImageDraw, ImageFont
+
+from browser_use.dom.views import DOMElementNode
+
+logger = logging.getLogger(__name__)
+
+# Same palette as the in-page highlights drawn by buildDomTree.js
+HIGHLIGHT_COLORS = (
+    "#FF0000",
+    "#00FF00",
+    "#0000FF",
+    "#FFA500",
+    "#800080",
+    "#008080",
+    "#FF69B4",
+    "#4B0082",
+    "#FF4500",
+    "#2E8B57",
+    "#DC143C",
+    "#4682B4",
+)
+
+LABEL_WIDTH = 20
+LABEL_HEIGHT = 16
+
+# zlib level for re-encoding PNG screenshots; the files are transient, so encode
+# speed matters more than size
+PNG_COMPRESS_LEVEL = 1
+
+
+@lru_cache(maxsize=1)
+def _label_font() -> ImageFont.ImageFont:
+    """Load the label font once instead of on every screenshot."""
+    return ImageFont.load_default()
+
+
+def draw_highlights(screenshot: bytes,
+                    elements: Iterable[DOMElementNode],
+                    full_page: bool = True,
+                    focus_element: int = -1) -> bytes:
+    """
+    Draw a colored, index-labelled box around each element on a screenshot.
+
+    Args:
+        screenshot: Encoded screenshot bytes
+        elements: Highlighted elements with their coordinates filled in
+        full_page: Whether the screenshot covers the full page (page coordinates)
+            or only the viewport (viewport coordinates)
+        focus_element: Only draw the element with this index (-1 for all)
+
+    Returns:
+        The screenshot with the boxes drawn, encoded in its original format
+    """
+    with Image.open(io.BytesIO(screenshot)) as img:
+        image_format = img.format or "PNG"
+        img = img.convert("RGB")
+
+    draw = ImageDraw.Draw(img)
+    font = _label_font()
+
+    for element in elements:
+        index = element.highlight_index
+        if index is None or (focus_element >= 0 and index != focus_element):
+            continue
+
+        rect = element.page_coordinates if full_page else element.viewport_coordinates
+        if rect is None or rect.width <= 0 or rect.height <= 0:
+            continue
+
+        color = HIGHLIGHT_COLORS[index % len(HIGHLIGHT_COLORS)]
+        left, top = rect.x, rect.y
+        right, bottom = left + rect.width, top + rect.height
+        draw.rectangle([left, top, right, bottom], outline=color, width=2)
+
+        # Place the label inside the top-right corner, or above the box if it is too small
+        label_left = right - LABEL_WIDTH - 2
+        label_top = top + 2
+        if rect.width < LABEL_WIDTH + 4 or rect.height < LABEL_HEIGHT + 4:
+            label_left = right - LABEL_WIDTH
+            label_top = top - LABEL_HEIGHT - 2
+        draw.rectangle([label_left, label_top, label_left + LABEL_WIDTH, label_top + LABEL_HEIGHT], fill=color)
+        draw.text((label_left + 3, label_top + 2), str(index), fill="white", font=font)
+
+    buffer = io.BytesIO()
+    if image_format == "PNG":
+        img.save(buffer, image_format, compress_level=PNG_COMPRESS_LEVEL)
+    else:
+        img.save(buffer, image_format)
+    return buffer.getvalue()
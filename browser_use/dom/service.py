@@ -1,16 +1,21 @@
+import asyncio
 import gc
 import json
 import logging
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 from importlib import resources
+from pathlib import Path
 from typing import TYPE_CHECKING, Optional, Tuple, Dict, List, Union, Any
 from urllib.parse import urlparse
 
 if TYPE_CHECKING:
     from playwright.async_api import Page
 
+from browser_use.dom.highlights import draw_highlights
 from browser_use.dom.views import (
+    CoordinateSet,
     DOMElementNode,
     DOMState,
     DOMTextNode,
@@ -21,16 +26,42 @@ from browser_use.utils import time_execution_async
 
 logger = logging.getLogger(__name__)
 
+# Name of the page global that holds buildDomTree.js once it has been preloaded
+BUILD_DOM_TREE_GLOBAL = '__browserUseBuildDomTree'
+
+# Id of the element buildDomTree.js draws its in-page highlights into
+HIGHLIGHT_CONTAINER_ID = 'playwright-highlight-container'
+
+
+@lru_cache(maxsize=1)
+def _load_build_dom_tree_js() -> str:
+    """Read buildDomTree.js once per process; every DomService shares the same source string."""
+    js_file_path = os.path.join(os.path.dirname(__file__), 'buildDomTree.js')
+    with open(js_file_path, 'r') as file:
+        return file.read()
+
 
 class DomService:
     def __init__(self, page: 'Page'):
         self.page = page
         self.xpath_cache = {}
-        
-        # Read the JS code from the file
-        js_file_path = os.path.join(os.path.dirname(__file__), 'buildDomTree.js')
-        with open(js_file_path, 'r') as file:
-            self.js_code = file.read()
+        # Screenshot copies still being written to disk in the background
+        self._pending_writes: set = set()
+        self.js_code = _load_build_dom_tree_js()
+        self._preloaded = False
+        # Most recent extraction and the URL it was taken on, reused by click_element
+        self.last_state: Optional[DOMState] = None
+        self._last_state_url: Optional[str] = None
+
+    async def preload(self) -> None:
+        """
+        Register the DOM extraction script as an init script on the page.
+
+        Every document loaded afterwards defines the script as a page global, so
+        extraction calls only send a short invocation instead of the full script source.
+        """
+        await self.page.add_init_script(f'window.{BUILD_DOM_TREE_GLOBAL} = {self.js_code};')
+        self._preloaded = True
 
     @time_execution_async('--get_clickable_elements')
     async def get_clickable_elements(
@@ -51,7 +82,9 @@ class DomService:
             A DOMState object containing the element tree and selector map
         """
         element_tree, selector_map = await self._build_dom_tree(highlight_elements, focus_element, viewport_expansion)
-        return DOMState(element_tree=element_tree, selector_map=selector_map)
+        self.last_state = DOMState(element_tree=element_tree, selector_map=selector_map)
+        self._last_state_url = self.page.url
+        return self.last_state
 
     @time_execution_async('--get_cross_origin_iframes')
     async def get_cross_origin_iframes(self) -> list[str]:
@@ -122,7 +155,16 @@ class DomService:
         }
 
         try:
-            eval_page: dict = await self.page.evaluate(self.js_code, args)
+            eval_page: Optional[dict] = None
+            if self._preloaded:
+                eval_page = await self.page.evaluate(
+                    f'args => typeof window.{BUILD_DOM_TREE_GLOBAL} === "function" '
+                    f'? window.{BUILD_DOM_TREE_GLOBAL}(args) : null',
+                    args,
+                )
+            if eval_page is None:
+                # Not preloaded, or the document predates the init script
+                eval_page = await self.page.evaluate(self.js_code, args)
         except Exception as e:
             logger.error('Error evaluating JavaScript: %s', e)
             raise
@@ -225,6 +267,14 @@ class DomService:
                 height=node_data['viewport']['height'],
             )
 
+        viewport_coordinates = None
+        page_coordinates = None
+
+        if 'viewportCoordinates' in node_data:
+            viewport_coordinates = CoordinateSet(**node_data['viewportCoordinates'])
+        if 'pageCoordinates' in node_data:
+            page_coordinates = CoordinateSet(**node_data['pageCoordinates'])
+
         element_node = DOMElementNode(
             tag_name=node_data['tagName'],
             xpath=node_data['xpath'],
@@ -235,6 +285,8 @@ class DomService:
             is_in_viewport=node_data.get('isInViewport', False),
             highlight_index=node_data.get('highlightIndex'),
             shadow_root=node_data.get('shadowRoot', False),
+            viewport_coordinates=viewport_coordinates,
+            page_coordinates=page_coordinates,
             viewport_info=viewport_info,
         )
 
@@ -242,6 +294,16 @@ class DomService:
 
         return element_node, children_ids
 
+    async def remove_highlights(self) -> None:
+        """Remove the in-page highlights drawn by get_clickable_elements()."""
+        try:
+            await self.page.evaluate(
+                'id => { const container = document.getElementById(id); if (container) container.remove(); }',
+                HIGHLIGHT_CONTAINER_ID,
+            )
+        except Exception as e:
+            logger.debug(f'Error removing highlights: {e}')
+
     async def take_screenshot_with_highlights(self, output_path: str) -> str:
         """
         Take a screenshot of the page with highlighted elements.
@@ -255,6 +317,65 @@ class DomService:
         await self.page.screenshot(path=output_path, full_page=True)
         return output_path
         
+    async def capture_highlighted_state(
+        self,
+        output_path: Optional[str] = None,
+        focus_element: int = -1,
+        viewport_expansion: int = 0,
+        full_page: bool = False,
+    ) -> Tuple[DOMState, bytes]:
+        """
+        Extract the clickable elements and take a single screenshot with their
+        highlight boxes drawn onto it.
+        
+        The boxes are drawn on the captured image rather than injected into the page,
+        so no overlay elements or listeners are left behind in the DOM.
+        
+        Args:
+            output_path: Optional path to also save the screenshot to (written in the
+                background, see `flush_writes()`)
+            focus_element: The index of the element to focus on (-1 for none)
+            viewport_expansion: How much to expand the viewport for detection
+            full_page: Capture the full scrollable page instead of the viewport. Tall
+                pages become unreadable once downscaled for a vision model
+            
+        Returns:
+            A tuple containing the DOM state and the screenshot bytes
+        """
+        # Nothing is drawn into the page, so the DOM walk and the screenshot are
+        # independent and can run concurrently
+        dom_state, screenshot = await asyncio.gather(
+            self.get_clickable_elements(
+                highlight_elements=False,
+                focus_element=focus_element,
+                viewport_expansion=viewport_expansion,
+            ),
+            self.page.screenshot(full_page=full_page, type='png', animations='disabled', caret='hide'),
+        )
+        screenshot = await asyncio.to_thread(
+            draw_highlights,
+            screenshot,
+            dom_state.selector_map.values(),
+            full_page,
+            focus_element,
+        )
+        
+        if output_path:
+            # The caller works from the in-memory bytes, so the disk copy is off the critical path
+            task = asyncio.create_task(asyncio.to_thread(Path(output_path).write_bytes, screenshot))
+            self._pending_writes.add(task)
+            task.add_done_callback(self._pending_writes.discard)
+        return dom_state, screenshot
+    
+    async def flush_writes(self) -> None:
+        """Wait until all background screenshot writes have finished."""
+        if not self._pending_writes:
+            return
+        results = await asyncio.gather(*self._pending_writes, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"Error saving screenshot: {result}")
+        
     async def click_element(self, highlight_index: int) -> bool:
         """
         Click an element by its highlight index.
@@ -265,18 +386,42 @@ class DomService:
         Returns:
             True if the element was clicked, False otherwise
         """
+        # The index refers to the last extraction, so only re-extract when there is
+        # none for the current page
+        dom_state = self.last_state
+        if (dom_state is not None and self._last_state_url == self.page.url
+                and highlight_index in dom_state.selector_map):
+            if await self._click_in_state(dom_state, highlight_index, log_failure=False):
+                return True
+            # Single-page apps change the DOM without changing the URL, so the cached
+            # state may be stale; re-extract and try once more
+            logger.debug(f"Click on cached element {highlight_index} failed, re-extracting")
+        
         dom_state = await self.get_clickable_elements()
-        if highlight_index in dom_state.selector_map:
-            element = dom_state.selector_map[highlight_index]
-            xpath = element.xpath
+        return await self._click_in_state(dom_state, highlight_index)
+
+    async def _click_in_state(self, dom_state: DOMState, highlight_index: int, log_failure: bool = True) -> bool:
+        """
+        Click the element with the given highlight index in an extracted DOM state.
+        
+        Args:
+            dom_state: The extraction the index refers to
+            highlight_index: The highlight index of the element to click
+            log_failure: Whether to log an error if the click fails
             
-            try:
-                # Click the element by xpath
-                element_handle = await self.page.wait_for_selector(f"xpath={xpath}", timeout=2000)
-                if element_handle:
-                    await element_handle.click()
-                    return True
-            except Exception as e:
-                logger.error(f"Error clicking element with xpath {xpath}: {e}")
+        Returns:
+            True if the element was clicked, False otherwise
+        """
+        element = dom_state.selector_map.get(highlight_index)
+        if element is None:
+            return False
         
-        return False 
\ No newline at end of file
+        kind, value = element.selector
+        try:
+            # data-buid stamped elements resolve with an attribute selector
+            await self.page.locator(f"xpath={value}" if kind == 'xpath' else value).click(timeout=2000)
+            return True
+        except Exception as e:
+            if log_failure:
+                logger.error(f"Error clicking element {value}: {e}")
+            return False
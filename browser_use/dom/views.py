@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field
 from functools import cached_property
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 @dataclass
 class ViewportInfo:
@@ -14,6 +14,9 @@ class CoordinateSet:
     width: float
     height: float
 
+# A selector tagged with its kind: ("css", value) or ("xpath", value)
+Selector = Tuple[str, str]
+
 # Forward reference for typing
 DOMElementNodeType = 'DOMElementNode'
 
@@ -68,12 +71,12 @@ class DOMElementNode:
     node_type: str = 'ELEMENT_NODE'
 
     def __repr__(self) -> str:
-        tag_str = f'<{self.tag_name}'
+        parts = [f'<{self.tag_name}']
 
         # Add attributes
-        for key, value in self.attributes.items():
-            tag_str += f' {key}="{value}"'
-        tag_str += '>'
+        parts.extend(f' {key}="{value}"' for key, value in self.attributes.items())
+        parts.append('>')
+        tag_str = ''.join(parts)
 
         # Add extra info
         extras = []
@@ -93,6 +96,14 @@ class DOMElementNode:
 
         return tag_str
 
+    @cached_property
+    def selector(self) -> Selector:
+        """Typed selector for the element, preferring its data-buid stamp over the xpath."""
+        buid = self.attributes.get('data-buid')
+        if buid:
+            return ('css', f'[data-buid="{buid}"]')
+        return ('xpath', self.xpath)
+
     def get_all_text_till_next_clickable_element(self, max_depth: int = -1) -> str:
         text_parts = []
 
@@ -136,16 +147,9 @@ class DOMElementNode:
                         if text in attributes:
                             attributes.remove(text)
                         attributes_str = ';'.join(attributes)
-                    line = f'[{node.highlight_index}]<{node.tag_name} '
-                    if attributes_str:
-                        line += f'{attributes_str}'
-                    if text:
-                        if attributes_str:
-                            line += f'>{text}'
-                        else:
-                            line += f'{text}'
-                    line += '/>'
-                    formatted_text.append(line)
+                    # Text is separated from attributes with '>' when both are present
+                    text_part = f'>{text}' if attributes_str and text else text
+                    formatted_text.append(f'[{node.highlight_index}]<{node.tag_name} {attributes_str}{text_part}/>')
 
                 # Process children regardless
                 for child in node.children:
@@ -114,9 +114,9 @@ class DataExtractor:
                 result = []
                 for element in elements:
                     item = {}
+                    # Parse each element once and share it between the child configs
+                    child_extractor = DataExtractor(str(element))
                     for child_config in config.children:
-                        child_soup = BeautifulSoup(str(element), 'lxml')
-                        child_extractor = DataExtractor(str(element))
                         key = child_config.selector.replace('#', '').replace('.', '')
                         item[key] = child_extractor.extract(child_config)
                     result.append(item)
@@ -132,9 +132,8 @@ class DataExtractor:
             else:
                 # Extract nested data
                 result = {}
+                child_extractor = DataExtractor(str(element))
                 for child_config in config.children:
-                    child_soup = BeautifulSoup(str(element), 'lxml')
-                    child_extractor = DataExtractor(str(element))
                     key = child_config.selector.replace('#', '').replace('.', '')
                     result[key] = child_extractor.extract(child_config)
                 return result
@@ -288,6 +287,17 @@ class DataExtractor:
             return element.get_text(strip=True)
 
 
+# Collects the header texts and the <td> texts of each row of the table passed as arguments[0]
+_READ_TABLE_JS = """
+const table = arguments[0];
+const text = (cell) => (cell.innerText || '').trim();
+return {
+    headers: Array.from(table.querySelectorAll('th'), text),
+    rows: Array.from(table.querySelectorAll('tr'), (row) => Array.from(row.querySelectorAll('td'), text)),
+};
+"""
+
+
 class WebElementExtractor:
     """
     Data extraction class for Selenium WebElements.
@@ -328,32 +338,19 @@ class WebElementExtractor:
         if not table_element:
             return []
             
-        # Get table headers
-        header_elements = table_element.find_elements("xpath", ".//th")
-        
-        if not header_elements:
-            # Try finding header cells in the first row
-            first_row = table_element.find_elements("xpath", ".//tr")[0]
-            header_elements = first_row.find_elements("xpath", ".//td")
+        # Read every cell in one script call instead of a WebDriver round trip per cell
+        table = table_element.parent.execute_script(_READ_TABLE_JS, table_element)
+        if not table["rows"]:
+            return []
             
-        # If still no headers, use column indices as headers
-        if not header_elements:
-            # Get the first row to determine number of columns
-            first_row = table_element.find_elements("xpath", ".//tr")[0]
-            td_count = len(first_row.find_elements("xpath", ".//td"))
-            headers = [f"column_{i}" for i in range(td_count)]
-        else:
-            headers = [h.text.strip() for h in header_elements]
+        # Use the <th> cells as headers, falling back to the cells of the first row
+        headers = table["headers"] or table["rows"][0]
             
-        # Get table rows (skip header row)
-        rows = table_element.find_elements("xpath", ".//tr")[1:]
-        
-        # Extract data from each row
+        # Extract data from each row (skip header row)
         result = []
-        for row in rows:
-            cells = row.find_elements("xpath", ".//td")
+        for cells in table["rows"][1:]:
             if len(cells) > 0:
-                row_data = {headers[i]: cell.text.strip() for i, cell in enumerate(cells) if i < len(headers)}
+                row_data = {headers[i]: cell for i, cell in enumerate(cells) if i < len(headers)}
                 result.append(row_data)
                 
         return result
@@ -384,24 +381,27 @@ def extract_structured_data(html_content: str) -> Dict[str, Any]:
     }
     
     # Try to detect and extract common data structures
-    detected_data = _detect_and_extract_common_data(html_content)
+    detected_data = _detect_and_extract_common_data(html_content, extractor)
     if detected_data:
         result.update(detected_data)
         
     return result
     
-def _detect_and_extract_common_data(html_content: str) -> Dict[str, Any]:
+def _detect_and_extract_common_data(html_content: str,
+                                    extractor: Optional[DataExtractor] = None) -> Dict[str, Any]:
     """
     Detect and extract common data structures from HTML.
     
     Args:
         html_content: HTML content to extract data from
+        extractor: Extractor that has already parsed html_content, to avoid parsing it again
         
     Returns:
         Dictionary with extracted data
     """
-    extractor = DataExtractor(html_content)
-    soup = BeautifulSoup(html_content, 'lxml')
+    if extractor is None:
+        extractor = DataExtractor(html_content)
+    soup = extractor.soup
     result = {}
     
     # Detect and extract products
@@ -433,14 +433,15 @@ def _detect_and_extract_common_data(html_content: str) -> Dict[str, Any]:
         
         for i, table in enumerate(tables):
             headers = [th.get_text(strip=True) for th in table.select('th')]
+            table_rows = table.select('tr')
             
-            if not headers and table.select('tr'):
+            if not headers and table_rows:
                 # Try getting headers from first row
-                first_row = table.select('tr')[0]
+                first_row = table_rows[0]
                 headers = [td.get_text(strip=True) for td in first_row.select('td')]
-                rows = table.select('tr')[1:]
+                rows = table_rows[1:]
             else:
-                rows = table.select('tr')
+                rows = table_rows
                 
             # If still no headers, use column indices
             if not headers and rows:
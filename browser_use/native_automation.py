@@ -99,6 +99,19 @@ class NativeBrowserAutomation:
             The path to the saved screenshot
         """
         return await self.browser.take_screenshot(path)
+    
+    async def get_screenshot_bytes(self, image_format: str = "png", quality: Optional[int] = None) -> bytes:
+        """
+        Take a screenshot of the current page without writing it to disk.
+        
+        Args:
+            image_format: "png" or "jpeg" (JPEG is only produced by Chrome)
+            quality: JPEG quality (ignored for PNG)
+            
+        Returns:
+            The encoded screenshot
+        """
+        return await self.browser.get_screenshot_bytes(image_format, quality)
         
     async def extract_data(self, extraction_config: Dict[str, Any]) -> Any:
         """
@@ -4,9 +4,12 @@ This module provides direct access to native browsers using their APIs without r
 third-party browser automation frameworks like Playwright.
 """
 
+import asyncio
+import base64
 import logging
 import os
 import time
+from collections import OrderedDict
 from enum import Enum
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Set, Tuple, Union
@@ -30,6 +33,12 @@ from webdriver_manager.firefox import GeckoDriverManager
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of pooled HTTP connections to the WebDriver server
+COMMAND_POOL_SIZE = 16
+
+# Maximum number of located elements remembered for the current page
+ELEMENT_CACHE_SIZE = 128
+
 class BrowserType(Enum):
     """Enum for supported browser types."""
     CHROME = "chrome"
@@ -41,6 +50,9 @@ class NativeBrowser:
     Uses Selenium WebDriver with direct browser-specific interfaces.
     """
     
+    # Driver executable paths resolved by webdriver-manager, shared by all instances
+    _driver_paths: Dict[BrowserType, str] = {}
+    
     def __init__(self, 
                  browser_type: BrowserType = BrowserType.CHROME,
                  headless: bool = False,
@@ -79,6 +91,9 @@ class NativeBrowser:
         self.driver = None
         self.wait = None
         
+        # Elements located on the current page, keyed by (by, selector)
+        self._element_cache: "OrderedDict[Tuple[str, str], WebElement]" = OrderedDict()
+        
     async def start(self) -> None:
         """Start the browser and initialize it."""
         if self.browser_type == BrowserType.CHROME:
@@ -93,6 +108,27 @@ class NativeBrowser:
         
         logger.info(f"Started {self.browser_type.value} browser")
         
+    @classmethod
+    def _driver_path(cls, browser_type: BrowserType) -> str:
+        """
+        Get the driver executable for a browser, installing it on first use.
+        
+        webdriver-manager checks its cache (and possibly the network) on every
+        install() call, so the resolved path is kept for later instances.
+        
+        Args:
+            browser_type: The browser the driver is for
+            
+        Returns:
+            Path to the driver executable
+        """
+        path = cls._driver_paths.get(browser_type)
+        if path is None:
+            manager = ChromeDriverManager() if browser_type == BrowserType.CHROME else GeckoDriverManager()
+            path = manager.install()
+            cls._driver_paths[browser_type] = path
+        return path
+        
     def _start_chrome(self) -> None:
         """Start Chrome browser with configured options."""
         options = ChromeOptions()
@@ -136,8 +172,9 @@ class NativeBrowser:
         options.add_argument("--disable-blink-features=AutomationControlled")
         
         # Create and start Chrome driver
-        service = ChromeService(ChromeDriverManager().install())
+        service = ChromeService(self._driver_path(BrowserType.CHROME))
         self.driver = webdriver.Chrome(service=service, options=options)
+        self._enlarge_connection_pool()
         
     def _start_firefox(self) -> None:
         """Start Firefox browser with configured options."""
@@ -178,8 +215,30 @@ class NativeBrowser:
                 options.set_preference("network.proxy.password", self.proxy_config['password'])
         
         # Create and start Firefox driver
-        service = FirefoxService(GeckoDriverManager().install())
+        service = FirefoxService(self._driver_path(BrowserType.FIREFOX))
         self.driver = webdriver.Firefox(service=service, options=options)
+        self._enlarge_connection_pool()
+        
+    def _enlarge_connection_pool(self) -> None:
+        """
+        Let the driver's HTTP client keep several connections to the driver server.
+        
+        Selenium's urllib3 pool keeps a single connection by default, so commands sent
+        from helper threads (e.g. via asyncio.to_thread) queue behind each other and log
+        "connection pool is full" warnings. Local drivers don't accept a ClientConfig,
+        so the connection manager is rebuilt with a larger pool after startup.
+        """
+        executor = self.driver.command_executor
+        try:
+            executor._client_config.init_args_for_pool_manager = {
+                "init_args_for_pool_manager": {"maxsize": COMMAND_POOL_SIZE}
+            }
+            old_conn = executor._conn
+            executor._conn = executor._get_connection_manager()
+            old_conn.clear()
+        except AttributeError as e:
+            # Internals differ between Selenium versions; the default pool still works
+            logger.debug(f"Could not resize WebDriver connection pool: {e}")
         
     async def stop(self) -> None:
         """Stop the browser and clean up resources."""
@@ -187,6 +246,7 @@ class NativeBrowser:
             self.driver.quit()
             self.driver = None
             self.wait = None
+        self._element_cache.clear()
             
         logger.info(f"Stopped {self.browser_type.value} browser")
         
@@ -201,29 +261,32 @@ class NativeBrowser:
             raise RuntimeError("Browser not started. Call start() first.")
         
         logger.info(f"Navigating to {url}")
-        self.driver.get(url)
+        self._element_cache.clear()
+        # WebDriver calls block until the page loads, so run them off the event loop
+        await asyncio.to_thread(self.driver.get, url)
         
         # Wait for page to load
-        self._wait_for_page_load()
+        await self._wait_for_page_load()
         
-    def _wait_for_page_load(self, timeout: int = 30) -> None:
+    async def _wait_for_page_load(self, timeout: int = 30) -> None:
         """
         Wait for the page to fully load.
         
+        Polls from a worker thread and waits with asyncio.sleep, so other tasks keep
+        running while the page loads.
+        
         Args:
             timeout: Maximum wait time in seconds
         """
-        old_page = self.driver.find_element(By.TAG_NAME, "html")
-        
         # Wait for the DOM to be in ready state
         end_time = time.time() + timeout
         while time.time() < end_time:
-            page_state = self.driver.execute_script("return document.readyState")
+            page_state = await asyncio.to_thread(self.driver.execute_script, "return document.readyState")
             if page_state == "complete":
                 # Additional wait for any JavaScript to finish
-                time.sleep(0.5)
+                await asyncio.sleep(0.5)
                 return
-            time.sleep(0.1)
+            await asyncio.sleep(0.1)
             
         logger.warning("Page load timed out")
         
@@ -244,9 +307,43 @@ class NativeBrowser:
             path = str(self.output_dir / f"screenshot_{int(time.time())}.png")
             
         logger.info(f"Taking screenshot: {path}")
-        self.driver.save_screenshot(path)
+        if path.lower().endswith((".jpg", ".jpeg")):
+            data = await self.get_screenshot_bytes("jpeg", quality=80)
+        else:
+            data = await self.get_screenshot_bytes()
+        await asyncio.to_thread(Path(path).write_bytes, data)
         return path
     
+    async def get_screenshot_bytes(self, image_format: str = "png", quality: Optional[int] = None) -> bytes:
+        """
+        Take a screenshot of the current page without writing it to disk.
+        
+        Chrome captures through a single CDP Page.captureScreenshot call, which can
+        encode JPEG directly. Firefox always returns PNG.
+        
+        Args:
+            image_format: "png" or "jpeg"
+            quality: JPEG quality (ignored for PNG)
+            
+        Returns:
+            The encoded screenshot
+        """
+        if not self.driver:
+            raise RuntimeError("Browser not started. Call start() first.")
+        
+        if self.browser_type != BrowserType.CHROME:
+            return await asyncio.to_thread(self.driver.get_screenshot_as_png)
+        
+        params: Dict[str, Any] = {
+            "format": image_format,
+            "fromSurface": True,
+            "captureBeyondViewport": False,
+        }
+        if image_format == "jpeg" and quality is not None:
+            params["quality"] = quality
+        result = await asyncio.to_thread(self.driver.execute_cdp_cmd, "Page.captureScreenshot", params)
+        return base64.b64decode(result["data"])
+    
     async def get_current_url(self) -> str:
         """
         Get the current URL.
@@ -298,17 +395,12 @@ class NativeBrowser:
             raise RuntimeError("Browser not started. Call start() first.")
         
         try:
-            # Handle XPath selectors
-            if selector.startswith("//") and by == By.CSS_SELECTOR:
-                by = By.XPATH
-                
             # Wait for element to be clickable and click it
-            element = self.wait.until(
-                EC.element_to_be_clickable((by, selector))
-            )
+            element = self._locate(by, selector, EC.element_to_be_clickable)
             element.click()
             return True
-        except (NoSuchElementException, TimeoutException, ElementClickInterceptedException) as e:
+        except (NoSuchElementException, TimeoutException, ElementClickInterceptedException,
+                StaleElementReferenceException) as e:
             logger.warning(f"Error clicking element {selector}: {e}")
             return False
             
@@ -328,18 +420,12 @@ class NativeBrowser:
             raise RuntimeError("Browser not started. Call start() first.")
         
         try:
-            # Handle XPath selectors
-            if selector.startswith("//") and by == By.CSS_SELECTOR:
-                by = By.XPATH
-                
             # Wait for element to be present, clear it, and input text
-            element = self.wait.until(
-                EC.presence_of_element_located((by, selector))
-            )
+            element = self._locate(by, selector)
             element.clear()
             element.send_keys(text)
             return True
-        except (NoSuchElementException, TimeoutException) as e:
+        except (NoSuchElementException, TimeoutException, StaleElementReferenceException) as e:
             logger.warning(f"Error inputting text to {selector}: {e}")
             return False
             
@@ -358,18 +444,51 @@ class NativeBrowser:
             raise RuntimeError("Browser not started. Call start() first.")
         
         try:
-            # Handle XPath selectors
-            if selector.startswith("//") and by == By.CSS_SELECTOR:
-                by = By.XPATH
-                
-            element = self.wait.until(
-                EC.presence_of_element_located((by, selector))
-            )
+            element = self._locate(by, selector)
             return element.text
-        except (NoSuchElementException, TimeoutException) as e:
+        except (NoSuchElementException, TimeoutException, StaleElementReferenceException) as e:
             logger.warning(f"Error getting text from {selector}: {e}")
             return None
     
+    def _locate(self, by: By, selector: str, condition=EC.presence_of_element_located) -> WebElement:
+        """
+        Find an element, reusing the one found earlier for the same selector on this page.
+        
+        A cached element is checked with a single is_displayed() call; if it has gone
+        stale or is hidden, it is looked up again with the wait condition.
+        
+        Args:
+            by: Selenium By type for selector
+            selector: Element selector (CSS selector, XPath, etc.)
+            condition: Expected condition used when the element has to be looked up
+            
+        Returns:
+            The WebElement
+            
+        Raises:
+            TimeoutException: If the element doesn't satisfy the condition in time
+        """
+        # Handle XPath selectors
+        if selector.startswith("//") and by == By.CSS_SELECTOR:
+            by = By.XPATH
+        
+        key = (by, selector)
+        element = self._element_cache.get(key)
+        if element is not None:
+            try:
+                if element.is_displayed():
+                    self._element_cache.move_to_end(key)
+                    return element
+            except StaleElementReferenceException:
+                pass
+            del self._element_cache[key]
+        
+        element = self.wait.until(condition((by, selector)))
+        self._element_cache[key] = element
+        if len(self._element_cache) > ELEMENT_CACHE_SIZE:
+            self._element_cache.popitem(last=False)
+        return element
+    
     async def wait_for_element(self, selector: str, by: By = By.CSS_SELECTOR, timeout: int = 10) -> Optional[WebElement]:
         """
         Wait for an element to be present on the page.
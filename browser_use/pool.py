@@ -0,0 +1,208 @@
+"""
+Browser pool for reusing started native browser automations.
+
+Starting a WebDriver session (driver resolution, browser launch, first page) is
+the most expensive part of a short automation. The pool keeps released browsers
+warm, resets their session state and hands them to the next caller with the same
+configuration instead of launching a new browser every time.
+"""
+
+import asyncio
+import atexit
+import logging
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Dict, Hashable, List, Optional, Tuple
+
+from browser_use.native_automation import NativeBrowserAutomation
+from browser_use.native_browser import BrowserType
+
+logger = logging.getLogger(__name__)
+
+
+def _pool_key(browser_type: BrowserType,
+              headless: bool,
+              proxy_config: Optional[Dict[str, str]],
+              extensions: Optional[List[str]]) -> Tuple[Hashable, ...]:
+    """
+    Build the key identifying interchangeable browser configurations.
+
+    The output directory is not part of the key; it is set on each lease instead.
+    """
+    proxy = tuple(sorted(proxy_config.items())) if proxy_config else None
+    return (browser_type, headless, proxy, tuple(extensions or ()))
+
+
+def _set_output_dir(automation: NativeBrowserAutomation, output_dir: str) -> None:
+    """Point a pooled automation at the output directory of its current lease."""
+    path = Path(output_dir)
+    path.mkdir(exist_ok=True)
+    automation.output_dir = path
+    automation.browser.output_dir = path
+
+
+class BrowserPool:
+    """
+    Pool of started NativeBrowserAutomation instances keyed by configuration.
+
+    Use `lease()` as an async context manager, or pair `acquire()` with `release()`.
+    """
+
+    def __init__(self, max_idle_per_key: int = 4, max_uses: Optional[int] = 50):
+        """
+        Initialize the pool.
+
+        Args:
+            max_idle_per_key: Maximum number of idle browsers kept per configuration
+            max_uses: Number of leases after which a browser is stopped instead of
+                reused, so long-lived browsers don't accumulate memory (None for no limit)
+        """
+        self.max_idle_per_key = max_idle_per_key
+        self.max_uses = max_uses
+        self._idle: Dict[Tuple[Hashable, ...], List[NativeBrowserAutomation]] = {}
+        self._keys: Dict[int, Tuple[Hashable, ...]] = {}
+        self._uses: Dict[int, int] = {}
+
+    async def acquire(self,
+                      browser_type: BrowserType = BrowserType.CHROME,
+                      headless: bool = False,
+                      proxy_config: Optional[Dict[str, str]] = None,
+                      extensions: Optional[List[str]] = None,
+                      output_dir: str = "output") -> NativeBrowserAutomation:
+        """
+        Get a started browser automation, reusing an idle one when possible.
+
+        Args:
+            browser_type: Type of browser (CHROME or FIREFOX)
+            headless: Whether to run in headless mode
+            proxy_config: Proxy configuration (dict with host, port, username, password)
+            extensions: List of paths to browser extension files
+            output_dir: Directory to save screenshots and other outputs
+
+        Returns:
+            A started NativeBrowserAutomation instance
+        """
+        key = _pool_key(browser_type, headless, proxy_config, extensions)
+        idle = self._idle.get(key)
+        if idle:
+            automation = idle.pop()
+            _set_output_dir(automation, output_dir)
+            logger.debug(f"Reusing pooled {browser_type.value} browser")
+            return automation
+
+        automation = NativeBrowserAutomation(
+            browser_type=browser_type,
+            headless=headless,
+            proxy_config=proxy_config,
+            extensions=extensions,
+            output_dir=output_dir
+        )
+        await automation.start()
+        self._keys[id(automation)] = key
+        return automation
+
+    async def release(self, automation: NativeBrowserAutomation) -> None:
+        """
+        Return a browser automation to the pool.
+
+        The session is reset (cookies and, for Chrome, the HTTP cache cleared, blank
+        page) before it is reused. If the reset fails, the pool is full or the browser
+        has reached `max_uses`, it is stopped instead.
+
+        Args:
+            automation: An automation previously returned by `acquire()`
+        """
+        key = self._keys.get(id(automation))
+        idle = self._idle.setdefault(key, []) if key is not None else None
+
+        uses = self._uses.get(id(automation), 0) + 1
+        self._uses[id(automation)] = uses
+        if self.max_uses is not None and uses >= self.max_uses:
+            logger.debug(f"Recycling pooled browser after {uses} uses")
+            await self._discard(automation)
+            return
+
+        if idle is None or len(idle) >= self.max_idle_per_key:
+            await self._discard(automation)
+            return
+
+        try:
+            await automation.delete_all_cookies()
+            if automation.browser.browser_type == BrowserType.CHROME:
+                # Cached responses would otherwise leak between leases
+                await asyncio.to_thread(
+                    automation.browser.driver.execute_cdp_cmd, "Network.clearBrowserCache", {}
+                )
+            await automation.navigate_to("about:blank")
+        except Exception as e:
+            logger.warning(f"Failed to reset pooled browser, closing it: {e}")
+            await self._discard(automation)
+            return
+
+        idle.append(automation)
+
+    async def warm(self, count: int, **kwargs) -> None:
+        """
+        Start browsers ahead of time so the first acquisitions don't pay for startup.
+
+        Args:
+            count: Number of idle browsers to have ready for the configuration
+            **kwargs: Browser configuration, see `acquire()`
+        """
+        started = [await self.acquire(**kwargs) for _ in range(count)]
+        for automation in started:
+            await self.release(automation)
+
+    @asynccontextmanager
+    async def lease(self, **kwargs) -> AsyncIterator[NativeBrowserAutomation]:
+        """
+        Lease a started browser automation for the duration of a block.
+
+        Args:
+            **kwargs: Browser configuration, see `acquire()`
+
+        Yields:
+            A started NativeBrowserAutomation instance
+        """
+        automation = await self.acquire(**kwargs)
+        try:
+            yield automation
+        finally:
+            await self.release(automation)
+
+    async def close(self) -> None:
+        """Stop all idle browsers."""
+        for idle in self._idle.values():
+            while idle:
+                await self._discard(idle.pop())
+
+    async def _discard(self, automation: NativeBrowserAutomation) -> None:
+        """Stop a browser and forget about it."""
+        self._keys.pop(id(automation), None)
+        self._uses.pop(id(automation), None)
+        try:
+            await automation.stop()
+        except Exception as e:
+            logger.warning(f"Error stopping pooled browser: {e}")
+
+    def _close_at_exit(self) -> None:
+        """Quit idle browsers synchronously when the interpreter exits."""
+        for idle in self._idle.values():
+            while idle:
+                driver = idle.pop().browser.driver
+                if driver is not None:
+                    try:
+                        driver.quit()
+                    except Exception:
+                        pass
+
+
+# Default process-wide pool
+_default_pool = BrowserPool()
+atexit.register(_default_pool._close_at_exit)
+
+acquire = _default_pool.acquire
+release = _default_pool.release
+lease = _default_pool.lease
+warm = _default_pool.warm
+close = _default_pool.close
@@ -7,12 +7,16 @@ import time
 from pathlib import Path
 from typing import Dict, Any, Optional
 import random
+import shutil
+
+import aiofiles
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
 from browser_use.automation import BrowserAutomation
+from browser_use.ai.llm_controller import strip_code_fence
 
 # Configure logging with colors
 import colorlog
@@ -33,6 +37,36 @@ logger = logging.getLogger('task_runner')
 logger.addHandler(handler)
 logger.setLevel(logging.INFO)
 
+# Prompt for planning the next step; the per-step state is substituted with %
+NEXT_STEP_PROMPT_TEMPLATE = """
+# Task Execution Planning
+
+You are an AI assistant helping to break down and execute a complex task in a web browser.
+
+## Overall Task
+%s
+
+## Current State
+- Current URL: %s
+- Page Title: %s
+- Step Number: %d of %d maximum steps
+
+## Interactive Elements Available
+%s
+
+## History of Steps Executed
+%s
+
+## Instructions
+1. Based on the overall task and current state, determine the next specific step to take.
+2. Respond with ONLY a single instruction describing what to do next.
+3. Be specific (e.g., "Click on the 'Login' button" rather than "Navigate to the login page").
+4. If the task appears to be completed, respond with only "TASK COMPLETED".
+5. Do not include reasoning or explain your choice, ONLY provide the single step instruction.
+
+Respond with the next step instruction only:
+"""
+
 class RateLimiter:
     """Simple rate limiter to prevent too many requests to the LLM API"""
     
@@ -148,8 +182,8 @@ class TaskRunner:
         task_dir.mkdir(exist_ok=True)
         
         # Save task description
-        with open(task_dir / "task.txt", "w") as f:
-            f.write(task_description)
+        async with aiofiles.open(task_dir / "task.txt", "w") as f:
+            await f.write(task_description)
         
         # Execute steps until max_steps is reached or task is completed
         while self.current_step_number < self.max_steps:
@@ -167,7 +201,7 @@ class TaskRunner:
                 result = await self._execute_step(next_step)
                 
                 # Save step results
-                self._save_step_result(task_dir, next_step, result)
+                await self._save_step_result(task_dir, next_step, result)
                 
                 # Add jitter to avoid hitting rate limits
                 await asyncio.sleep(random.uniform(0.5, 1.5))
@@ -175,13 +209,15 @@ class TaskRunner:
             except Exception as e:
                 logger.error(f"Error executing task: {e}", exc_info=True)
                 # Save error information
-                with open(task_dir / f"error_step_{self.current_step_number}.txt", "w") as f:
-                    f.write(f"Error: {str(e)}\n")
-                    f.write(f"Step: {next_step if 'next_step' in locals() else 'unknown'}\n")
+                async with aiofiles.open(task_dir / f"error_step_{self.current_step_number}.txt", "w") as f:
+                    await f.write(
+                        f"Error: {str(e)}\n"
+                        f"Step: {next_step if 'next_step' in locals() else 'unknown'}\n"
+                    )
                 break
         
         # Save final task summary
-        self._save_task_summary(task_dir)
+        await self._save_task_summary(task_dir)
         
         return {
             "status": "completed" if self.current_step_number < self.max_steps else "max_steps_reached",
@@ -196,16 +232,12 @@ class TaskRunner:
         Returns:
             Description of the next step
         """
-        # Get page information
+        # Get page information, fetching the title while the DOM state and an
+        # in-memory screenshot showing the highlighted elements are captured
         page_url = self.automation.page.url
+        capture_task = asyncio.create_task(self.automation.dom_service.capture_highlighted_state())
         page_title = await self.automation.browser.get_page_title()
-        
-        # Take screenshot for analysis
-        screenshot_path = str(self.output_dir / "current_state.jpg")
-        await self.automation.browser.take_screenshot(screenshot_path)
-        
-        # Get DOM information
-        dom_state = await self.automation.dom_service.get_clickable_elements()
+        dom_state, screenshot = await capture_task
         
         # Extract relevant information about elements
         elements_info = []
@@ -219,52 +251,25 @@ class TaskRunner:
             })
         
         # Create prompt for generating next step
-        prompt = f"""
-        # Task Execution Planning
-        
-        You are an AI assistant helping to break down and execute a complex task in a web browser.
-        
-        ## Overall Task
-        {self.task_description}
-        
-        ## Current State
-        - Current URL: {page_url}
-        - Page Title: {page_title}
-        - Step Number: {self.current_step_number + 1} of {self.max_steps} maximum steps
-        
-        ## Interactive Elements Available
-        {json.dumps(elements_info, indent=2)}
-        
-        ## History of Steps Executed
-        {self._format_step_history()}
-        
-        ## Instructions
-        1. Based on the overall task and current state, determine the next specific step to take.
-        2. Respond with ONLY a single instruction describing what to do next.
-        3. Be specific (e.g., "Click on the 'Login' button" rather than "Navigate to the login page").
-        4. If the task appears to be completed, respond with only "TASK COMPLETED".
-        5. Do not include reasoning or explain your choice, ONLY provide the single step instruction.
-        
-        Respond with the next step instruction only:
-        """
+        prompt = NEXT_STEP_PROMPT_TEMPLATE % (
+            self.task_description,
+            page_url,
+            page_title,
+            self.current_step_number + 1,
+            self.max_steps,
+            json.dumps(elements_info, indent=2),
+            self._format_step_history(),
+        )
         
         # Call LLM to generate next step
-        messages = [{"role": "user", "content": prompt}]
-        
         # For simplicity, reuse the automation's LLM controller
         try:
-            with open(screenshot_path, "rb") as img_file:
-                import base64
-                image_data = base64.b64encode(img_file.read()).decode("utf-8")
+            image_data = await self.automation.llm_controller.encode_image(screenshot)
             
             response = await self.automation.llm_controller._query_llm(prompt, image_data)
             
-            # Clean up response (remove markdown, code blocks, etc.)
-            clean_response = response.strip()
-            if clean_response.startswith("```"):
-                clean_response = clean_response.replace("```", "", 1)
-                if "```" in clean_response:
-                    clean_response = clean_response.split("```")[0].strip()
+            # Clean up response (remove markdown code blocks)
+            clean_response = strip_code_fence(response)
             
             # Log the next step
             logger.info(f"Generated next step: {clean_response}")
@@ -319,44 +324,43 @@ class TaskRunner:
         if not self.step_history:
             return "No steps executed yet."
         
-        history = "Previously completed steps:\n"
-        for step in self.step_history:
-            history += f"{step['step_number']}. {step['description']} ({step['result']})\n"
-        
-        return history
+        lines = ["Previously completed steps:\n"]
+        lines.extend(
+            f"{step['step_number']}. {step['description']} ({step['result']})\n"
+            for step in self.step_history
+        )
+        return "".join(lines)
     
-    def _save_step_result(self, task_dir: Path, step_description: str, result: Dict[str, Any]):
-        """Save step result to disk"""
+    async def _save_step_result(self, task_dir: Path, step_description: str, result: Dict[str, Any]):
+        """Save step result to disk without blocking the event loop"""
         step_dir = task_dir / f"step_{self.current_step_number}"
         step_dir.mkdir(exist_ok=True)
         
         # Save step description
-        with open(step_dir / "description.txt", "w") as f:
-            f.write(step_description)
+        async with aiofiles.open(step_dir / "description.txt", "w") as f:
+            await f.write(step_description)
         
         # Save result as JSON
-        with open(step_dir / "result.json", "w") as f:
-            json.dump(result, f, indent=2)
-        
-        # Copy screenshots if they exist
-        if "before_screenshot" in result and os.path.exists(result["before_screenshot"]):
-            import shutil
-            shutil.copy(result["before_screenshot"], step_dir / "before.jpg")
-        
-        if "after_screenshot" in result and os.path.exists(result["after_screenshot"]):
-            import shutil
-            shutil.copy(result["after_screenshot"], step_dir / "after.jpg")
+        async with aiofiles.open(step_dir / "result.json", "w") as f:
+            await f.write(json.dumps(result, indent=2))
+        
+        # Copy screenshots if they exist (the "after" one may still be being written)
+        await self.automation.flush_screenshots()
+        for name in ("before", "after"):
+            source = result.get(f"{name}_screenshot")
+            if source and os.path.exists(source):
+                await asyncio.to_thread(shutil.copy, source, step_dir / f"{name}{Path(source).suffix}")
     
-    def _save_task_summary(self, task_dir: Path):
-        """Save task summary to disk"""
-        with open(task_dir / "summary.json", "w") as f:
-            summary = {
-                "task_description": self.task_description,
-                "steps_executed": self.current_step_number,
-                "step_history": self.step_history,
-                "completed": self.current_step_number < self.max_steps
-            }
-            json.dump(summary, f, indent=2)
+    async def _save_task_summary(self, task_dir: Path):
+        """Save task summary to disk without blocking the event loop"""
+        summary = {
+            "task_description": self.task_description,
+            "steps_executed": self.current_step_number,
+            "step_history": self.step_history,
+            "completed": self.current_step_number < self.max_steps
+        }
+        async with aiofiles.open(task_dir / "summary.json", "w") as f:
+            await f.write(json.dumps(summary, indent=2))
 
 async def main():
     """Main entry point for the task runner."""